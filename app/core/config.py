@@ -45,6 +45,9 @@ class Settings(BaseSettings):
     DEFAULT_EPOCHS: int = 100
     DEFAULT_BATCH_SIZE: int = 16
     DEFAULT_IMAGE_SIZE: int = 640
+    MAX_DATALOADER_WORKERS: int = 16
+    ENABLE_TORCH_COMPILE: bool = True  # torch.compile no treinamento em CUDA
+    ENABLE_MULTI_GPU: bool = False  # DDP em todas as GPUs visíveis (CUDA_VISIBLE_DEVICES)
     
     # Sistema
     GPU_MEMORY_THRESHOLD: float = 0.9  # 90% de uso máximo
@@ -53,6 +56,11 @@ class Settings(BaseSettings):
     # Monitoramento
     SYSTEM_MONITOR_INTERVAL: int = 5  # segundos
     JOB_UPDATE_INTERVAL: int = 1  # segundos
+    CPU_SAMPLE_INTERVAL: float = 1.0  # segundos entre amostras de uso de CPU
+    RESOURCES_TTL: float = 0.5  # segundos de validade do cache de recursos
+    GPU_INFO_TTL: float = 1.0  # segundos de validade do cache de GPU
+    DISK_INFO_TTL: float = 30.0  # segundos de validade do cache de disco
+    DISK_INCLUDE_REMOTE: bool = False  # incluir montagens NFS/CIFS/SSHFS no monitoramento
     
     # Logging
     LOG_LEVEL: str = "INFO"
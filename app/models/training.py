@@ -5,7 +5,7 @@ Baseado no PRD - Seção 6: Estrutura de Dados
 
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Literal, Optional, Any
 from pydantic import BaseModel, Field, validator
 
 
@@ -78,6 +78,7 @@ class TrainingConfig(BaseModel):
     workers: int = Field(default=8, ge=1, le=32)
     patience: int = Field(default=50, ge=1)
     save_period: int = Field(default=10, ge=1)
+    cache: Optional[Literal["ram", "disk", "none"]] = None  # None = sem cache
     
     # Augmentação
     augment: bool = True
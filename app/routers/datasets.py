@@ -369,7 +369,7 @@ async def _analyze_dataset(dataset_path: Path) -> DatasetInfo:
         if yaml_file.exists():
             import yaml
             with open(yaml_file, 'r') as f:
-                data = yaml.safe_load(f)
+                data = yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
                 names = data.get('names', [])
                 if isinstance(names, dict):
                     classes = list(names.values())
@@ -533,7 +533,7 @@ async def _calculate_dataset_statistics(dataset_path: Path) -> Dict[str, Any]:
         if yaml_file.exists():
             import yaml
             with open(yaml_file, 'r') as f:
-                data = yaml.safe_load(f)
+                data = yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
                 names = data.get('names', [])
                 if isinstance(names, dict):
                     stats["classes"]["names"] = list(names.values())
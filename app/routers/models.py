@@ -11,7 +11,7 @@ from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Q
 from fastapi.responses import FileResponse
 
 from app.models.system import ModelInfo
-from app.services.yolo_trainer import YOLOTrainer
+from app.services.yolo_trainer import get_yolo_trainer
 from app.core.config import settings
 from typing import Optional
 from fastapi import APIRouter, HTTPException, Depends
@@ -20,8 +20,8 @@ from app.core.security import verify_api_key
 
 router = APIRouter(prefix="/models", tags=["models"], dependencies=[Depends(verify_api_key)])
 
-# Instância do trainer YOLO
-yolo_trainer = YOLOTrainer()
+# Instância do trainer YOLO (a mesma usada pelos jobs de treinamento)
+yolo_trainer = get_yolo_trainer()
 
 
 @router.get("/", response_model=List[ModelInfo])
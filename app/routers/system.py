@@ -5,19 +5,16 @@ Baseado no PRD - Seção 4: Endpoints da API
 
 from typing import List, Dict, Any
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, ORJSONResponse
 
 from app.models.system import SystemResources, SystemStatus, ModelInfo, DatasetInfo
-from app.services.system_monitor import SystemMonitor
 from app.services.sse_manager import create_sse_response
 from app.core.config import settings
 from app.core.security import verify_api_key
+from app.core.globals import system_monitor
 
 router = APIRouter(prefix="/system", tags=["system"], dependencies=[Depends(verify_api_key)])
 
-# Instância do monitor de sistema
-system_monitor = SystemMonitor()
-
 
 @router.get("/resources", response_model=SystemResources)
 async def get_system_resources():
@@ -28,7 +25,9 @@ async def get_system_resources():
     """
     try:
         resources = await system_monitor.get_resources()
-        return resources
+        
+        # Serialização direta com orjson (evita a revalidação do response_model)
+        return ORJSONResponse(resources.model_dump())
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao obter recursos do sistema: {str(e)}")
@@ -57,8 +56,9 @@ async def get_gpu_info():
     Retorna lista com informações de todas as GPUs disponíveis
     """
     try:
-        gpu_info = await system_monitor.get_gpu_info()
-        return {"gpus": gpu_info}
+        # Snapshot compartilhado: enumeração NVML coalescida com as demais consultas
+        resources = await system_monitor.get_resources()
+        return {"gpus": resources.gpu}
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao obter informações da GPU: {str(e)}")
@@ -102,8 +102,9 @@ async def get_disk_info():
     Retorna informações sobre espaço em disco
     """
     try:
-        disk_info = await system_monitor.get_disk_info()
-        return disk_info
+        # Snapshot compartilhado: sondagem de partições coalescida com as demais consultas
+        resources = await system_monitor.get_resources()
+        return resources.disk
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao obter informações do disco: {str(e)}")
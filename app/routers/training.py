@@ -132,14 +132,12 @@ async def get_training_progress(job_id: str):
         if not job:
             raise HTTPException(status_code=404, detail=f"Job {job_id} não encontrado")
             
-        # Obter último progresso
-        # Placeholder: usa último evento de métricas se disponível
-        events = await job_manager.get_job_events(job_id)
-        metrics_events = [e for e in events if e.event_type == "metrics"]
-        if not metrics_events:
+        # Obter último progresso (último evento de métricas)
+        progress = await job_manager.get_last_metrics(job_id)
+        if progress is None:
             raise HTTPException(status_code=404, detail="Nenhum progresso disponível")
         
-        return metrics_events[-1]
+        return progress
         
     except HTTPException:
         raise
@@ -6,11 +6,16 @@ Baseado no PRD - Seção 7: Gerenciamento de Jobs
 import asyncio
 import json
 import logging
+import os
+import time
 import uuid
+from collections import defaultdict, deque
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any
-from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from pydantic import TypeAdapter
 
 from app.models.training import (
     TrainingJob, JobStatus, JobCreateRequest, TrainingConfig, 
@@ -18,10 +23,52 @@ from app.models.training import (
 )
 from app.core.config import settings
 # Lazy import: YOLOTrainer will be imported only when starting training to avoid heavy dependencies at API startup
-# from app.services.yolo_trainer import YOLOTrainer
+# from app.services.yolo_trainer import get_yolo_trainer
 
 logger = logging.getLogger("jobs")
 
+# Intervalo mínimo entre persistências de métricas de um mesmo job (segundos)
+METRICS_PERSIST_INTERVAL = 0.1
+
+# Histórico de métricas em colunas NumPy (ring buffer por job)
+MAX_JOB_EVENTS = 1000
+_METRIC_COLUMNS: Dict[str, Any] = {
+    "epoch": np.int32,
+    "total_epochs": np.int32,
+    "train_loss": np.float64,
+    "val_loss": np.float64,
+    "precision": np.float64,
+    "recall": np.float64,
+    "map50": np.float64,
+    "map50_95": np.float64,
+    "learning_rate": np.float64,
+}
+
+# Serializador da lista de jobs direto para JSON (sem dict intermediário)
+_JOBS_ADAPTER = TypeAdapter(List[TrainingJob])
+
+
+def _parse_label_classes(label_file: Path) -> set:
+    """Extrair IDs de classe de um arquivo de label YOLO"""
+    class_ids = set()
+    try:
+        with open(label_file, 'r') as f:
+            for line in f:
+                parts = line.strip().split()
+                if parts:
+                    class_ids.add(int(parts[0]))
+    except Exception:
+        pass
+    return class_ids
+
+
+def _scan_label_classes(labels_dir: Path) -> set:
+    """Unir os IDs de classe de todos os labels de um diretório"""
+    class_ids = set()
+    for label_file in labels_dir.glob("*.txt"):
+        class_ids |= _parse_label_classes(label_file)
+    return class_ids
+
 
 class JobManager:
     """Gerenciador de jobs de treinamento"""
@@ -29,13 +76,24 @@ class JobManager:
     def __init__(self):
         self.jobs: Dict[str, TrainingJob] = {}
         self.active_jobs: Dict[str, asyncio.Task] = {}
-        self.job_events: Dict[str, List[ProgressUpdate]] = {}
-        self.executor = ThreadPoolExecutor(max_workers=settings.MAX_CONCURRENT_JOBS)
+        # Últimos 1000 eventos não-métricos por job (deque descarta os mais antigos)
+        self.job_events: Dict[str, deque] = defaultdict(lambda: deque(maxlen=MAX_JOB_EVENTS))
+        # Eventos de métricas em colunas pré-alocadas + total de linhas escritas
+        self._metrics_cols: Dict[str, Dict[str, np.ndarray]] = {}
+        self._metrics_count: Dict[str, int] = {}
+        # Único controle de concorrência: jobs além do limite aguardam um slot livre
+        self._slot = asyncio.Semaphore(settings.MAX_CONCURRENT_JOBS)
+        # Contador incremental de jobs em execução (evita varrer self.jobs)
+        self._running_count = 0
         # Defer YOLOTrainer initialization to training time to prevent blocking imports (torch/cv2) during app startup
         self.yolo_trainer = None  # type: Optional[object]
         
         # Arquivo de persistência
         self.jobs_file = settings.DATA_DIR / "jobs.json"
+        # Serializa gravações concorrentes do arquivo temporário
+        self._save_lock = asyncio.Lock()
+        # Momento (monotônico) da última persistência de métricas por job
+        self._last_persist: Dict[str, float] = {}
         
     async def initialize(self):
         """Inicializar gerenciador"""
@@ -56,8 +114,9 @@ class JobManager:
         else:
             logger.info("📭 Nenhum job para salvar durante cleanup")
         
-        # Fechar executor
-        self.executor.shutdown(wait=True)
+        # Fechar pool de I/O do trainer (se o treinamento chegou a ser usado)
+        if self.yolo_trainer is not None:
+            await asyncio.to_thread(self.yolo_trainer.cleanup)
         logger.info("🧹 Cleanup do gerenciador de jobs concluído")
         
     async def load_jobs(self):
@@ -68,8 +127,8 @@ class JobManager:
             
             if self.jobs_file.exists():
                 logger.info(f"📖 Lendo conteúdo do arquivo...")
-                with open(self.jobs_file, 'r', encoding='utf-8') as f:
-                    jobs_data = json.load(f)
+                raw = await asyncio.to_thread(self.jobs_file.read_bytes)
+                jobs_data = json.loads(raw)
                 
                 logger.info(f"📊 Encontrados {len(jobs_data)} jobs no arquivo")
                 
@@ -100,28 +159,25 @@ class JobManager:
             logger.info(f"💾 Iniciando salvamento de jobs...")
             logger.info(f"📊 Jobs atuais no manager: {len(self.jobs)}")
             
-            jobs_data = []
-            for job in self.jobs.values():
-                # Converter para dict, tratando datetime
-                job_dict = job.dict()
-                
-                # Converter datetime para string ISO
-                for field in ['created_at', 'started_at', 'completed_at']:
-                    if job_dict.get(field):
-                        job_dict[field] = job_dict[field].isoformat()
-                        
-                jobs_data.append(job_dict)
+            # Serializar direto para JSON em bytes (datetimes já saem em ISO)
+            jobs_json = _JOBS_ADAPTER.dump_json(list(self.jobs.values()), indent=2)
             
-            logger.info(f"📝 Salvando {len(jobs_data)} jobs no arquivo")
+            logger.info(f"📝 Salvando {len(self.jobs)} jobs no arquivo")
             
-            with open(self.jobs_file, 'w', encoding='utf-8') as f:
-                json.dump(jobs_data, f, indent=2, ensure_ascii=False)
+            async with self._save_lock:
+                await asyncio.to_thread(self._write_jobs_file, jobs_json)
             
             logger.info(f"✅ Jobs salvos com sucesso em {self.jobs_file}")
             
         except Exception as e:
             logger.error(f"❌ Erro ao salvar jobs: {e}")
             
+    def _write_jobs_file(self, payload: bytes):
+        """Gravar arquivo de jobs de forma atômica (executado fora do event loop)"""
+        tmp_file = self.jobs_file.with_suffix(".json.tmp")
+        tmp_file.write_bytes(payload)
+        os.replace(tmp_file, self.jobs_file)
+            
     def generate_job_id(self) -> str:
         """Gerar ID único para job"""
         return f"job_{uuid.uuid4().hex[:8]}"
@@ -168,25 +224,15 @@ class JobManager:
             if not job:
                 raise ValueError(f"Job não encontrado: {job_id}")
                 
-            if job.status != JobStatus.PENDING:
+            if job.status != JobStatus.PENDING or job_id in self.active_jobs:
                 raise ValueError(f"Job {job_id} não está pendente (status: {job.status})")
                 
-            # Verificar limite de jobs simultâneos
-            active_count = len([j for j in self.jobs.values() if j.status == JobStatus.RUNNING])
-            if active_count >= settings.MAX_CONCURRENT_JOBS:
-                raise ValueError(f"Limite de jobs simultâneos atingido ({settings.MAX_CONCURRENT_JOBS})")
-                
-            # Atualizar status
-            job.status = JobStatus.RUNNING
-            job.started_at = datetime.now()
-            
-            # Criar task assíncrona
+            # Criar task assíncrona; o limite de jobs simultâneos é aplicado
+            # pelo semáforo em _run_training (jobs excedentes ficam na fila)
             task = asyncio.create_task(self._run_training(job))
             self.active_jobs[job_id] = task
             
-            await self.save_jobs()
-            
-            logger.info(f"🚀 Job iniciado: {job_id}")
+            logger.info(f"🚀 Job enfileirado para execução: {job_id}")
             
             return True
             
@@ -248,7 +294,7 @@ class JobManager:
         """Obter estatísticas dos jobs"""
         total = len(self.jobs)
         pending = len([j for j in self.jobs.values() if j.status == JobStatus.PENDING])
-        running = len([j for j in self.jobs.values() if j.status == JobStatus.RUNNING])
+        running = self._running_count
         completed = len([j for j in self.jobs.values() if j.status == JobStatus.COMPLETED])
         failed = len([j for j in self.jobs.values() if j.status == JobStatus.FAILED])
         cancelled = len([j for j in self.jobs.values() if j.status == JobStatus.CANCELLED])
@@ -265,14 +311,85 @@ class JobManager:
         
     async def get_job_events(self, job_id: str) -> List[ProgressUpdate]:
         """Obter eventos de um job"""
-        return self.job_events.get(job_id, [])
+        events = list(self.job_events.get(job_id, ()))
+        
+        cols = self._metrics_cols.get(job_id)
+        if cols is None:
+            return events
+            
+        # Reconstruir eventos de métricas a partir das colunas (ordem cronológica)
+        count = self._metrics_count[job_id]
+        if count <= MAX_JOB_EVENTS:
+            order = range(count)
+        else:
+            start = count % MAX_JOB_EVENTS
+            order = [(start + i) % MAX_JOB_EVENTS for i in range(MAX_JOB_EVENTS)]
+            
+        rows = {name: cols[name].tolist() for name in _METRIC_COLUMNS}
+        timestamps = cols["timestamp"].tolist()
+        for i in order:
+            data = {}
+            for name, values in rows.items():
+                value = values[i]
+                data[name] = None if value != value else value  # NaN -> None
+            events.append(ProgressUpdate.model_construct(
+                job_id=job_id,
+                event_type="metrics",
+                data=data,
+                timestamp=datetime.fromtimestamp(timestamps[i])
+            ))
+            
+        events.sort(key=lambda e: e.timestamp)
+        return events
+        
+    async def get_last_metrics(self, job_id: str) -> Optional[ProgressUpdate]:
+        """Obter o evento de métricas mais recente (lê só a última posição do ring buffer)"""
+        cols = self._metrics_cols.get(job_id)
+        if cols is None:
+            return None
+            
+        slot = (self._metrics_count[job_id] - 1) % MAX_JOB_EVENTS
+        data = {}
+        for name in _METRIC_COLUMNS:
+            value = cols[name][slot].item()
+            data[name] = None if value != value else value  # NaN -> None
+        return ProgressUpdate.model_construct(
+            job_id=job_id,
+            event_type="metrics",
+            data=data,
+            timestamp=datetime.fromtimestamp(cols["timestamp"][slot].item())
+        )
+        
+    def _add_metrics_row(self, job_id: str, data: Dict[str, Any], timestamp: datetime):
+        """Gravar métricas na próxima posição do ring buffer do job"""
+        cols = self._metrics_cols.get(job_id)
+        if cols is None:
+            cols = {
+                name: np.zeros(MAX_JOB_EVENTS, dtype=dtype)
+                for name, dtype in _METRIC_COLUMNS.items()
+            }
+            cols["timestamp"] = np.zeros(MAX_JOB_EVENTS, dtype=np.float64)
+            self._metrics_cols[job_id] = cols
+            self._metrics_count[job_id] = 0
+            
+        count = self._metrics_count[job_id]
+        slot = count % MAX_JOB_EVENTS
+        for name, dtype in _METRIC_COLUMNS.items():
+            value = data.get(name)
+            if value is None:
+                value = np.nan if np.issubdtype(dtype, np.floating) else 0
+            cols[name][slot] = value
+        cols["timestamp"][slot] = timestamp.timestamp()
+        self._metrics_count[job_id] = count + 1
         
     async def add_job_event(self, job_id: str, event_type: str, data: Dict[str, Any]):
         """Adicionar evento a um job"""
-        if job_id not in self.job_events:
-            self.job_events[job_id] = []
+        if event_type == "metrics":
+            self._add_metrics_row(job_id, data, datetime.now())
+            return
             
-        event = ProgressUpdate(
+        # Dados já validados pelos chamadores; evitar revalidação
+        event = ProgressUpdate.model_construct(
             job_id=job_id,
             event_type=event_type,
             data=data,
@@ -280,10 +397,6 @@ class JobManager:
         )
         
         self.job_events[job_id].append(event)
-        
-        # Manter apenas os últimos 1000 eventos por job
-        if len(self.job_events[job_id]) > 1000:
-            self.job_events[job_id] = self.job_events[job_id][-1000:]
             
     async def _analyze_dataset(self, dataset_path: Path) -> DatasetInfo:
         """Analisar dataset e extrair informações"""
@@ -296,7 +409,7 @@ class JobManager:
             if yaml_file.exists():
                 import yaml
                 with open(yaml_file, 'r') as f:
-                    data = yaml.safe_load(f)
+                    data = yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
                     
                 classes = data.get('names', [])
                 if isinstance(classes, dict):
@@ -307,17 +420,9 @@ class JobManager:
                 classes = []
                 labels_dir = dataset_path / "labels" / "train"
                 if labels_dir.exists():
-                    # Analisar arquivos de label para encontrar classes
-                    class_ids = set()
-                    for label_file in labels_dir.glob("*.txt"):
-                        try:
-                            with open(label_file, 'r') as f:
-                                for line in f:
-                                    parts = line.strip().split()
-                                    if parts:
-                                        class_ids.add(int(parts[0]))
-                        except:
-                            continue
+                    # Varredura inteira em uma thread, fora do event loop (sem
+                    # ocupar o pool de jobs de treinamento)
+                    class_ids = await asyncio.to_thread(_scan_label_classes, labels_dir)
                     classes = [f"class_{i}" for i in sorted(class_ids)]
                     
             # Contar imagens
@@ -363,8 +468,8 @@ class JobManager:
             
             # Lazy import and instantiate YOLOTrainer when training actually starts
             if self.yolo_trainer is None:
-                from app.services.yolo_trainer import YOLOTrainer
-                self.yolo_trainer = YOLOTrainer()
+                from app.services.yolo_trainer import get_yolo_trainer
+                self.yolo_trainer = get_yolo_trainer()
             
             # Callback para atualizações de progresso
             async def progress_callback(metrics: TrainingMetrics):
@@ -372,11 +477,29 @@ class JobManager:
                 job.current_epoch = metrics.epoch
                 job.progress_percent = (metrics.epoch / metrics.total_epochs) * 100
                 
-                await self.add_job_event(job.id, "metrics", metrics.dict())
+                # Limitar persistência a ~10Hz por job; última época sempre registrada
+                now = time.monotonic()
+                last = self._last_persist.get(job.id, 0.0)
+                if now - last < METRICS_PERSIST_INTERVAL and metrics.epoch != metrics.total_epochs:
+                    return
+                self._last_persist[job.id] = now
+                
+                await self.add_job_event(job.id, "metrics", metrics.model_dump())
                 await self.save_jobs()
                 
-            # Executar treinamento
-            result = await self.yolo_trainer.train(job, progress_callback)
+            # Aguardar slot livre e executar treinamento
+            async with self._slot:
+                job.status = JobStatus.RUNNING
+                job.started_at = datetime.now()
+                await self.save_jobs()
+                
+                logger.info(f"🚀 Job iniciado: {job.id}")
+                
+                self._running_count += 1
+                try:
+                    result = await self.yolo_trainer.train(job, progress_callback)
+                finally:
+                    self._running_count -= 1
             
             if result["success"]:
                 job.status = JobStatus.COMPLETED
@@ -422,5 +545,6 @@ class JobManager:
             # Remover da lista de jobs ativos
             if job.id in self.active_jobs:
                 del self.active_jobs[job.id]
+            self._last_persist.pop(job.id, None)
                 
             await self.save_jobs()
\ No newline at end of file
@@ -4,15 +4,24 @@ Baseado no PRD - Seção 9: Atualizações em Tempo Real
 """
 
 import asyncio
-import json
 import logging
+from collections import defaultdict
 from datetime import datetime
 from typing import Dict, Set, Any, Optional
+
+import orjson
 from fastapi import Request
 from fastapi.responses import StreamingResponse
 
 logger = logging.getLogger("sse")
 
+# Intervalo entre heartbeats enviados a todas as conexões (segundos)
+HEARTBEAT_INTERVAL = 30.0
+
+# Delimitadores de frame SSE pré-codificados
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+
 
 class SSEManager:
     """Gerenciador de conexões SSE"""
@@ -26,13 +35,50 @@ class SSEManager:
         }
         
         # Filas por job específico
-        self.job_connections: Dict[str, Set[asyncio.Queue]] = {}
+        self.job_connections: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
         
         # Último estado conhecido (para novos clientes)
         self.last_state: Dict[str, Any] = {}
         
+        # Task única de heartbeat para todas as conexões (iniciada na
+        # primeira conexão, pois na construção ainda não há event loop)
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        
         logger.info("📡 SSE Manager inicializado")
         
+    def _ensure_heartbeat(self):
+        """Iniciar task de heartbeat se ainda não estiver rodando"""
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        
+    async def _heartbeat_loop(self):
+        """Enviar o mesmo heartbeat pré-codificado para todas as filas"""
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+        
+            heartbeat_frame = self._encode({
+                "type": "heartbeat",
+                "timestamp": datetime.now().isoformat()
+            })
+        
+            queues = set()
+            for conns in self.connections.values():
+                queues.update(conns)
+            for conns in self.job_connections.values():
+                queues.update(conns)
+        
+            for queue in queues:
+                try:
+                    queue.put_nowait(heartbeat_frame)
+                except asyncio.QueueFull:
+                    # Fila cheia já tem eventos pendentes; heartbeat dispensável
+                    pass
+        
+    @staticmethod
+    def _encode(message: Dict[str, Any]) -> bytes:
+        """Codificar mensagem no formato SSE (bytes UTF-8)"""
+        return _SSE_PREFIX + orjson.dumps(message) + _SSE_SUFFIX
+        
     async def add_connection(self, connection_type: str, queue: asyncio.Queue, job_id: Optional[str] = None):
         """Adicionar nova conexão SSE"""
         try:
@@ -41,8 +87,6 @@ class SSEManager:
                 
             # Conexão específica para job
             if job_id:
-                if job_id not in self.job_connections:
-                    self.job_connections[job_id] = set()
                 self.job_connections[job_id].add(queue)
                 
             # Enviar estado inicial se disponível
@@ -64,11 +108,12 @@ class SSEManager:
             if connection_type in self.connections:
                 self.connections[connection_type].discard(queue)
                 
-            if job_id and job_id in self.job_connections:
-                self.job_connections[job_id].discard(queue)
+            if job_id:
+                job_queues = self.job_connections[job_id]
+                job_queues.discard(queue)
                 
                 # Limpar se não há mais conexões para este job
-                if not self.job_connections[job_id]:
+                if not job_queues:
                     del self.job_connections[job_id]
                     
             logger.info(f"➖ Conexão SSE removida: {connection_type}" + (f" (job: {job_id})" if job_id else ""))
@@ -167,8 +212,7 @@ class SSEManager:
         """Enviar mensagem para uma fila específica"""
         try:
             # Formato SSE
-            sse_data = f"data: {json.dumps(message, ensure_ascii=False)}\n\n"
-            await queue.put(sse_data)
+            await queue.put(self._encode(message))
         except asyncio.QueueFull:
             logger.warning("Fila SSE cheia - descartando mensagem")
         except Exception as e:
@@ -191,17 +235,13 @@ class SSEManager:
                 "timestamp": datetime.now().isoformat()
             })
             
+            # Heartbeats chegam pela própria fila (task compartilhada)
+            self._ensure_heartbeat()
+            
             # Stream de eventos
             while True:
-                try:
-                    # Aguardar próximo evento com timeout
-                    data = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield data
-                    
-                except asyncio.TimeoutError:
-                    # Enviar heartbeat para manter conexão viva
-                    yield f"data: {json.dumps({'type': 'heartbeat', 'timestamp': datetime.now().isoformat()})}\n\n"
-                    
+                yield await queue.get()
+                
         except asyncio.CancelledError:
             logger.info(f"Stream SSE cancelado: {connection_type}" + (f" (job: {job_id})" if job_id else ""))
             
@@ -246,6 +286,10 @@ class SSEManager:
                 
             self.job_connections.clear()
             
+            # Parar heartbeat compartilhado
+            if self._heartbeat_task and not self._heartbeat_task.done():
+                self._heartbeat_task.cancel()
+            
             logger.info("🧹 SSE Manager finalizado")
             
         except Exception as e:
@@ -5,24 +5,18 @@ Baseado no PRD - Seção 5: Monitoramento de Recursos
 
 import asyncio
 import logging
+import os
 import platform
+import time
 from datetime import datetime
 from typing import List, Optional
 
 import psutil
-import torch
 from app.models.system import SystemResources, GPUInfo, CPUInfo, MemoryInfo, DiskInfo, SystemStatus
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-try:
-    import GPUtil
-    GPU_AVAILABLE = True
-except ImportError:
-    GPU_AVAILABLE = False
-    logger.warning("GPUtil não disponível - monitoramento de GPU desabilitado")
-
 try:
     import py3nvml.py3nvml as nvml
     nvml.nvmlInit()
@@ -32,6 +26,43 @@ except Exception:
     logger.warning("NVML não disponível - informações detalhadas de GPU desabilitadas")
 
 
+# Disponibilidade de CUDA é estável durante o processo: consultada uma vez,
+# sob demanda (importar torch custa segundos; não acontece no import do módulo)
+_CUDA_AVAILABLE: Optional[bool] = None
+_CUDA_DEVICE_COUNT = 0
+
+
+def _probe_cuda() -> int:
+    """Importar torch e registrar disponibilidade/quantidade de GPUs CUDA"""
+    global _CUDA_AVAILABLE, _CUDA_DEVICE_COUNT
+    try:
+        import torch
+    except ImportError:
+        _CUDA_AVAILABLE, _CUDA_DEVICE_COUNT = False, 0
+        return 0
+    _CUDA_AVAILABLE = torch.cuda.is_available()
+    _CUDA_DEVICE_COUNT = torch.cuda.device_count() if _CUDA_AVAILABLE else 0
+    return _CUDA_DEVICE_COUNT
+
+
+def _cuda_available() -> bool:
+    """Disponibilidade de CUDA (sonda na primeira consulta)"""
+    if _CUDA_AVAILABLE is None:
+        _probe_cuda()
+    return _CUDA_AVAILABLE
+
+# Sistemas de arquivos remotos: statvfs pode travar se o servidor não responder
+REMOTE_FSTYPES = {"nfs", "nfs4", "cifs", "smbfs", "fuse.sshfs"}
+
+# Tempo máximo para sondar todos os pontos de montagem (segundos)
+DISK_PROBE_TIMEOUT = 2.0
+
+
+def _mb(b: int) -> int:
+    """Converter bytes para MB (inteiro)"""
+    return b >> 20
+
+
 class SystemMonitor:
     """Monitor de recursos do sistema"""
     
@@ -40,17 +71,87 @@ class SystemMonitor:
         self.start_time = datetime.now()
         self._last_resources: Optional[SystemResources] = None
         
+        # Uso de CPU amostrado em background (sem bloquear o event loop)
+        psutil.cpu_percent(interval=None)  # Primeira chamada inicializa o contador
+        self._cpu_percent = 0.0
+        self._cpu_sampler_task: Optional[asyncio.Task] = None
+        
+        # Valores que não mudam durante a vida do processo
+        self._cpu_cores = psutil.cpu_count(logical=False) or 1
+        self._cpu_threads = psutil.cpu_count(logical=True) or 1
+        
+        # Partições montadas (revalidadas a cada 60s para hotplug)
+        self._partitions = psutil.disk_partitions(all=False)
+        self._partitions_ts = time.monotonic()
+        
+        # Handles e nomes das GPUs via NVML
+        self._nvml_handles = []
+        self._gpu_names: List[str] = []
+        if NVML_AVAILABLE:
+            try:
+                self._nvml_handles = [
+                    nvml.nvmlDeviceGetHandleByIndex(i) for i in range(nvml.nvmlDeviceGetCount())
+                ]
+                self._gpu_names = [nvml.nvmlDeviceGetName(h) for h in self._nvml_handles]
+            except Exception as e:
+                logger.debug(f"Erro ao enumerar GPUs via NVML: {e}")
+        
+        # Frequência da CPU com cache (TTL de 5s)
+        self._cpu_freq = None
+        self._cpu_freq_ts = 0.0
+        
+        # Sensor de temperatura da CPU (descoberto em start(), TTL de 2s)
+        self._cpu_temp_key: Optional[str] = None
+        self._cpu_temp: Optional[float] = None
+        self._temp_ts = 0.0
+        
+        # Cache de recursos com TTL (monotônico) e TTLs por componente
+        self._resources_cache_ts = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._gpu_cache: Optional[List[GPUInfo]] = None
+        self._gpu_cache_ts = 0.0
+        self._disk_cache: Optional[List[DiskInfo]] = None
+        self._disk_cache_ts = 0.0
+        
     async def start(self):
         """Iniciar monitoramento"""
         self.running = True
         self.start_time = datetime.now()
+        self._cpu_sampler_task = asyncio.create_task(self._cpu_sampler())
+        self._probe_cpu_temp_sensor()
+        # Import do torch fora do event loop
+        await asyncio.to_thread(_probe_cuda)
         logger.info("🔍 Monitor de sistema iniciado")
         
     async def stop(self):
         """Parar monitoramento"""
         self.running = False
+        if self._cpu_sampler_task and not self._cpu_sampler_task.done():
+            self._cpu_sampler_task.cancel()
         logger.info("🛑 Monitor de sistema parado")
         
+    def rescan_cuda(self) -> int:
+        """Consultar novamente a disponibilidade de CUDA (ex.: testes)"""
+        return _probe_cuda()
+        
+    def _probe_cpu_temp_sensor(self):
+        """Descobrir uma única vez qual sensor corresponde à CPU"""
+        try:
+            if hasattr(psutil, "sensors_temperatures"):
+                temps = psutil.sensors_temperatures()
+                self._cpu_temp_key = next(
+                    (k for k, v in temps.items() if ("cpu" in k.lower() or "core" in k.lower()) and v),
+                    None
+                )
+        except Exception:
+            self._cpu_temp_key = None
+        
+    async def _cpu_sampler(self):
+        """Atualizar uso de CPU periodicamente (chamada não bloqueante)"""
+        while self.running:
+            await asyncio.sleep(settings.CPU_SAMPLE_INTERVAL)
+            self._cpu_percent = psutil.cpu_percent(interval=None)
+        
     def get_timestamp(self) -> datetime:
         """Obter timestamp atual"""
         return datetime.now()
@@ -58,35 +159,29 @@ class SystemMonitor:
     async def get_cpu_info(self) -> CPUInfo:
         """Obter informações da CPU"""
         try:
-            # Uso da CPU (média de 1 segundo)
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # Uso da CPU (última amostra do sampler em background)
+            cpu_percent = self._cpu_percent
             
-            # Informações básicas
-            cpu_count = psutil.cpu_count(logical=False)  # Cores físicos
-            cpu_threads = psutil.cpu_count(logical=True)  # Threads lógicas
-            
-            # Frequência
-            cpu_freq = psutil.cpu_freq()
+            # Frequência (cache de 5s)
+            now = time.monotonic()
+            if now - self._cpu_freq_ts > 5.0:
+                self._cpu_freq = psutil.cpu_freq()
+                self._cpu_freq_ts = now
+            cpu_freq = self._cpu_freq
             frequency = cpu_freq.current if cpu_freq else None
             
-            # Temperatura (se disponível)
-            temperature = None
-            try:
-                if hasattr(psutil, "sensors_temperatures"):
-                    temps = psutil.sensors_temperatures()
-                    if temps:
-                        # Tentar obter temperatura da CPU
-                        for name, entries in temps.items():
-                            if "cpu" in name.lower() or "core" in name.lower():
-                                if entries:
-                                    temperature = entries[0].current
-                                    break
-            except Exception:
-                pass
+            # Temperatura (apenas o sensor descoberto em start(); cache de 2s)
+            if self._cpu_temp_key and now - self._temp_ts > 2.0:
+                try:
+                    self._cpu_temp = psutil.sensors_temperatures()[self._cpu_temp_key][0].current
+                except Exception:
+                    self._cpu_temp = None
+                self._temp_ts = now
+            temperature = self._cpu_temp
                 
             return CPUInfo(
-                cores=cpu_count or 1,
-                threads=cpu_threads or 1,
+                cores=self._cpu_cores,
+                threads=self._cpu_threads,
                 usage_percent=cpu_percent,
                 frequency=frequency,
                 temperature=temperature
@@ -99,13 +194,13 @@ class SystemMonitor:
     async def get_memory_info(self) -> MemoryInfo:
         """Obter informações da memória"""
         try:
-            memory = psutil.virtual_memory()
+            memory = await asyncio.to_thread(psutil.virtual_memory)
             
             return MemoryInfo(
-                total=int(memory.total / 1024 / 1024),  # MB
-                used=int(memory.used / 1024 / 1024),    # MB
-                free=int(memory.free / 1024 / 1024),    # MB
-                available=int(memory.available / 1024 / 1024),  # MB
+                total=_mb(memory.total),  # MB
+                used=_mb(memory.used),    # MB
+                free=_mb(memory.free),    # MB
+                available=_mb(memory.available),  # MB
                 usage_percent=memory.percent
             )
             
@@ -114,108 +209,171 @@ class SystemMonitor:
             return MemoryInfo(total=0, used=0, free=0, available=0, usage_percent=0.0)
     
     async def get_gpu_info(self) -> Optional[List[GPUInfo]]:
-        """Obter informações das GPUs"""
-        if not GPU_AVAILABLE:
+        """Obter informações das GPUs (consultas NVML diretas)"""
+        if not NVML_AVAILABLE or not self._nvml_handles:
             return None
             
-        try:
-            gpus = []
-            
-            # Verificar se PyTorch detecta CUDA
-            cuda_available = torch.cuda.is_available()
-            if not cuda_available:
-                return None
-                
-            # Usar GPUtil para informações básicas
-            gpu_list = GPUtil.getGPUs()
+        # Verificar se PyTorch detecta CUDA
+        if not _cuda_available():
+            return None
             
-            for i, gpu in enumerate(gpu_list):
-                gpu_info = GPUInfo(
-                    id=i,
-                    name=gpu.name,
-                    memory_total=int(gpu.memoryTotal),
-                    memory_used=int(gpu.memoryUsed),
-                    memory_free=int(gpu.memoryFree),
-                    utilization=gpu.load * 100,
-                    temperature=gpu.temperature if hasattr(gpu, 'temperature') else None,
-                    available=True
-                )
-                
-                # Tentar obter informações adicionais com NVML
-                if NVML_AVAILABLE:
-                    try:
-                        handle = nvml.nvmlDeviceGetHandleByIndex(i)
-                        
-                        # Consumo de energia
-                        try:
-                            power = nvml.nvmlDeviceGetPowerUsage(handle) / 1000.0  # mW para W
-                            gpu_info.power_draw = power
-                        except:
-                            pass
-                            
-                        # Temperatura mais precisa
-                        try:
-                            temp = nvml.nvmlDeviceGetTemperature(handle, nvml.NVML_TEMPERATURE_GPU)
-                            gpu_info.temperature = temp
-                        except:
-                            pass
-                            
-                    except Exception as e:
-                        logger.debug(f"Erro ao obter informações NVML para GPU {i}: {e}")
-                
-                gpus.append(gpu_info)
-                
+        try:
+            # Todas as consultas NVML em uma única chamada fora do event loop
+            gpus = await asyncio.to_thread(self._collect_gpu_sync)
             return gpus if gpus else None
             
         except Exception as e:
             logger.error(f"Erro ao obter informações das GPUs: {e}")
             return None
     
+    def _collect_gpu_sync(self) -> List[GPUInfo]:
+        """Consultar todas as GPUs via NVML (bloqueante)"""
+        gpus = []
+        
+        for i, handle in enumerate(self._nvml_handles):
+            try:
+                memory = nvml.nvmlDeviceGetMemoryInfo(handle)
+                utilization = nvml.nvmlDeviceGetUtilizationRates(handle)
+            except Exception as e:
+                logger.debug(f"Erro ao obter informações NVML para GPU {i}: {e}")
+                continue
+                
+            gpu_info = GPUInfo(
+                id=i,
+                name=self._gpu_names[i],
+                memory_total=_mb(memory.total),  # MB
+                memory_used=_mb(memory.used),    # MB
+                memory_free=_mb(memory.free),    # MB
+                utilization=float(utilization.gpu),
+                available=True
+            )
+            
+            # Temperatura
+            try:
+                gpu_info.temperature = nvml.nvmlDeviceGetTemperature(handle, nvml.NVML_TEMPERATURE_GPU)
+            except Exception:
+                pass
+                
+            # Consumo de energia
+            try:
+                gpu_info.power_draw = nvml.nvmlDeviceGetPowerUsage(handle) / 1000.0  # mW para W
+            except Exception:
+                pass
+            
+            gpus.append(gpu_info)
+            
+        return gpus
+    
     async def get_disk_info(self) -> Optional[List[DiskInfo]]:
         """Obter informações dos discos"""
         try:
-            disks = []
-            
-            # Obter informações dos pontos de montagem
-            partitions = psutil.disk_partitions()
-            
-            for partition in partitions:
-                try:
-                    usage = psutil.disk_usage(partition.mountpoint)
-                    
-                    disk_info = DiskInfo(
-                        path=partition.mountpoint,
-                        total=int(usage.total / 1024 / 1024),  # MB
-                        used=int(usage.used / 1024 / 1024),    # MB
-                        free=int(usage.free / 1024 / 1024),    # MB
-                        usage_percent=(usage.used / usage.total) * 100
-                    )
-                    
-                    disks.append(disk_info)
-                    
-                except PermissionError:
-                    # Ignorar partições sem permissão
-                    continue
-                except Exception as e:
-                    logger.debug(f"Erro ao obter informações do disco {partition.mountpoint}: {e}")
-                    continue
-                    
+            # Sondagem em lote fora do event loop; montagens travadas não bloqueiam o servidor
+            disks = await asyncio.wait_for(
+                asyncio.to_thread(self._collect_disk_sync),
+                timeout=DISK_PROBE_TIMEOUT
+            )
             return disks if disks else None
             
+        except asyncio.TimeoutError:
+            logger.warning(f"Sondagem de discos excedeu {DISK_PROBE_TIMEOUT}s - ponto de montagem travado?")
+            return None
         except Exception as e:
             logger.error(f"Erro ao obter informações dos discos: {e}")
             return None
     
+    def _collect_disk_sync(self) -> List[DiskInfo]:
+        """Consultar todos os pontos de montagem (bloqueante)"""
+        disks = []
+        
+        # Pontos de montagem (cache com TTL de 60s)
+        now = time.monotonic()
+        if now - self._partitions_ts > 60.0:
+            self._partitions = psutil.disk_partitions(all=False)
+            self._partitions_ts = now
+        partitions = self._partitions
+        
+        for partition in partitions:
+            # Ignorar montagens remotas, salvo se explicitamente habilitadas
+            if partition.fstype in REMOTE_FSTYPES and not settings.DISK_INCLUDE_REMOTE:
+                continue
+                
+            try:
+                if hasattr(os, "statvfs"):
+                    st = os.statvfs(partition.mountpoint)
+                    total = st.f_blocks * st.f_frsize
+                    used = (st.f_blocks - st.f_bfree) * st.f_frsize
+                    free = st.f_bavail * st.f_frsize
+                else:
+                    usage = psutil.disk_usage(partition.mountpoint)
+                    total, used, free = usage.total, usage.used, usage.free
+                
+                disk_info = DiskInfo(
+                    path=partition.mountpoint,
+                    total=_mb(total),  # MB
+                    used=_mb(used),    # MB
+                    free=_mb(free),    # MB
+                    usage_percent=(used * 100) // total if total else 0
+                )
+                
+                disks.append(disk_info)
+                
+            except PermissionError:
+                # Ignorar partições sem permissão
+                continue
+            except Exception as e:
+                logger.debug(f"Erro ao obter informações do disco {partition.mountpoint}: {e}")
+                continue
+                
+        return disks
+    
     async def get_resources(self) -> SystemResources:
         """Obter recursos completos do sistema"""
+        if self._resources_fresh():
+            return self._last_resources
+            
+        # Chamadas concorrentes aguardam uma única atualização
+        async with self._refresh_lock:
+            if self._resources_fresh():
+                return self._last_resources
+            return await self._refresh_resources()
+            
+    async def _get_gpu_info_cached(self, now: float) -> Optional[List[GPUInfo]]:
+        """Obter informações das GPUs respeitando GPU_INFO_TTL"""
+        if now - self._gpu_cache_ts >= settings.GPU_INFO_TTL:
+            self._gpu_cache = await self.get_gpu_info()
+            self._gpu_cache_ts = now
+        return self._gpu_cache
+        
+    async def _get_disk_info_cached(self, now: float) -> Optional[List[DiskInfo]]:
+        """Obter informações dos discos respeitando DISK_INFO_TTL"""
+        if now - self._disk_cache_ts >= settings.DISK_INFO_TTL:
+            self._disk_cache = await self.get_disk_info()
+            self._disk_cache_ts = now
+        return self._disk_cache
+        
+    def _resources_fresh(self) -> bool:
+        """Verificar se o último resultado ainda está dentro do TTL"""
+        return (
+            self._last_resources is not None
+            and time.monotonic() - self._resources_cache_ts < settings.RESOURCES_TTL
+        )
+        
+    async def _refresh_resources(self) -> SystemResources:
+        """Consultar os componentes e atualizar o cache"""
         try:
-            # Obter informações de todos os componentes
-            cpu_info = await self.get_cpu_info()
-            memory_info = await self.get_memory_info()
-            gpu_info = await self.get_gpu_info()
-            disk_info = await self.get_disk_info()
+            now = time.monotonic()
+            
+            # Componentes independentes consultados em paralelo;
+            # GPU e disco têm TTL próprio
+            cpu_info, memory_info, gpu_info, disk_info = await asyncio.gather(
+                self.get_cpu_info(),
+                self.get_memory_info(),
+                self._get_gpu_info_cached(now),
+                self._get_disk_info_cached(now)
+            )
             
-            resources = SystemResources(
+            # Componentes já validados individualmente; dispensar revalidação
+            resources = SystemResources.model_construct(
                 timestamp=self.get_timestamp(),
                 cpu=cpu_info,
                 memory=memory_info,
@@ -225,6 +383,7 @@ class SystemMonitor:
             
             # Cache do último resultado
             self._last_resources = resources
+            self._resources_cache_ts = now
             
             return resources
             
@@ -253,9 +412,7 @@ class SystemMonitor:
                 pass
             
             # Verificar se GPU está disponível
-            gpu_available = False
-            if torch.cuda.is_available():
-                gpu_available = True
+            gpu_available = _cuda_available()
             
             # Obter recursos atuais
             resources = await self.get_resources()
@@ -4,12 +4,20 @@ Baseado no PRD - Seção 8: Integração com Ultralytics YOLO
 """
 
 import asyncio
+import copy
+import io
+import json
 import logging
 import shutil
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Callable, Optional
-from datetime import datetime
+from typing import Dict, Any, Callable, List, Optional, Tuple
 
+import numpy as np
 import torch
 from ultralytics import YOLO
 import yaml
@@ -18,23 +26,367 @@ import re
 
 from app.models.training import TrainingJob, TrainingMetrics, ModelType
 from app.core.config import settings
+from app.utils.helpers import copy_file_fast
 
 logger = logging.getLogger("yolo_trainer")
 
+# torch.compile via argumento 'compile' (Ultralytics >= 8.3.196, torch >= 2.1)
+try:
+    from ultralytics.cfg import DEFAULT_CFG_DICT
+    _ULTRALYTICS_COMPILE = 'compile' in DEFAULT_CFG_DICT
+except ImportError:
+    _ULTRALYTICS_COMPILE = False
+
+_TORCH_VERSION = tuple(int(p) for p in torch.__version__.split('+')[0].split('.')[:2] if p.isdigit())
+COMPILE_AVAILABLE = _ULTRALYTICS_COMPILE and _TORCH_VERSION >= (2, 1)
+
+# Chaves das métricas do Ultralytics, na ordem dos campos de TrainingMetrics
+_METRIC_KEYS = (
+    'train/box_loss',
+    'val/box_loss',
+    'metrics/precision(B)',
+    'metrics/recall(B)',
+    'metrics/mAP50(B)',
+    'metrics/mAP50-95(B)'
+)
+_METRIC_FIELDS = ('train_loss', 'val_loss', 'precision', 'recall', 'map50', 'map50_95')
+
+# Dígitos finais do nome da classe (ex.: "class_7" -> 7)
+_TRAIL_DIGITS = re.compile(r"(\d+)$")
+
+# Intervalo de leitura do results.csv no modo DDP (segundos)
+RESULTS_POLL_INTERVAL = 2.0
+
+# Tempo de retenção dos modelos recém-treinados em memória (segundos)
+POST_TRAIN_MODEL_TTL = 60 * 60
+
+# Número máximo de modelos recém-treinados mantidos em memória
+MAX_POST_TRAIN_MODELS = 1
+
+# Número máximo de modelos base mantidos em memória entre jobs
+MAX_BASE_MODEL_CACHE = 2
+
+# Backend C (libyaml) para leitura do data.yaml, com fallback puro Python
+try:
+    from yaml import CSafeLoader as _YLoader
+    YAML_C_AVAILABLE = True
+except ImportError:
+    from yaml import SafeLoader as _YLoader
+    YAML_C_AVAILABLE = False
+
+
+# Mapeamento de tipos de modelo para arquivos
+_MODEL_FILES_PT: Dict[ModelType, str] = {
+    ModelType.YOLOV8N: "yolov8n.pt",
+    ModelType.YOLOV8S: "yolov8s.pt",
+    ModelType.YOLOV8M: "yolov8m.pt",
+    ModelType.YOLOV8L: "yolov8l.pt",
+    ModelType.YOLOV8X: "yolov8x.pt",
+    ModelType.YOLOV9C: "yolov9c.pt",
+    ModelType.YOLOV9E: "yolov9e.pt",
+    ModelType.YOLOV10N: "yolov10n.pt",
+    ModelType.YOLOV10S: "yolov10s.pt",
+    ModelType.YOLOV10M: "yolov10m.pt",
+    ModelType.YOLOV10L: "yolov10l.pt",
+    ModelType.YOLOV10X: "yolov10x.pt"
+}
+
+_MODEL_FILES_YAML: Dict[ModelType, str] = {
+    model_type: file_name.replace(".pt", ".yaml") for model_type, file_name in _MODEL_FILES_PT.items()
+}
+
+
+def _symlink_files(src_dir: Path, dst_dir: Path) -> None:
+    """Criar symlinks para todos os arquivos de src_dir em dst_dir (copiar como fallback)"""
+    with os.scandir(src_dir) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            dst = os.path.join(dst_dir, entry.name)
+            try:
+                os.symlink(entry.path, dst)
+            except FileExistsError:
+                # Preparado em execução anterior, talvez de outra origem:
+                # link com nome temporário + rename substitui de forma atômica
+                tmp = f"{dst}.tmp-{os.getpid()}"
+                os.symlink(entry.path, tmp)
+                os.replace(tmp, dst)
+            except OSError:
+                shutil.copy2(entry.path, dst)
+
+
+def _iter_label_files(labels_dir: Path):
+    """Listar arquivos .txt de um diretório de labels via scandir"""
+    with os.scandir(labels_dir) as entries:
+        return [Path(e.path) for e in entries if e.name.endswith('.txt') and e.is_file()]
+
+
+def _build_class_lut(class_mapping: Dict[int, int]) -> np.ndarray:
+    """Criar tabela de consulta original_id -> novo_id (-1 para classes não mapeadas)"""
+    if not class_mapping:
+        return np.empty(0, dtype=np.int64)
+    lut = np.full(max(class_mapping) + 1, -1, dtype=np.int64)
+    lut[list(class_mapping.keys())] = list(class_mapping.values())
+    return lut
+
+
+def _remap_label_lines(text: str, src_path: Path, lut: np.ndarray) -> str:
+    """Remapear linha a linha (labels com número variável de colunas)"""
+    lines_out = []
+    for line in text.splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        try:
+            orig_cls = int(parts[0])
+        except ValueError:
+            # Mantém linha se não conseguir interpretar índice
+            lines_out.append(line + "\n")
+            continue
+        if 0 <= orig_cls < len(lut) and lut[orig_cls] >= 0:
+            parts[0] = str(lut[orig_cls])
+        else:
+            logger.warning(f"Classe {orig_cls} não mapeada em {src_path}, descartando anotação.")
+            continue
+        lines_out.append(" ".join(parts) + "\n")
+    return "".join(lines_out)
+
+
+def _remap_label_file(src_path: Path, dst_path: Path, lut: Optional[np.ndarray]) -> bool:
+    """Remapear índices de classe de um arquivo de label YOLO via LUT vetorizada"""
+    if not src_path.exists():
+        return False
+    dst_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    # Sem mapeamento: manter anotações como estão
+    if lut is None:
+        shutil.copyfile(src_path, dst_path)
+        return True
+        
+    text = src_path.read_text()
+    if not text.strip():
+        dst_path.write_text("")
+        return True
+        
+    try:
+        arr = np.loadtxt(io.StringIO(text), ndmin=2)
+    except ValueError:
+        # Segmentação (colunas variáveis) ou índices não numéricos
+        dst_path.write_text(_remap_label_lines(text, src_path, lut))
+        return True
+        
+    orig = arr[:, 0].astype(np.int64)
+    in_range = (orig >= 0) & (orig < len(lut))
+    cls = np.full(len(orig), -1, dtype=np.int64)
+    cls[in_range] = lut[orig[in_range]]
+    keep = cls >= 0
+    if not keep.all():
+        logger.warning(f"{int((~keep).sum())} anotação(ões) com classe não mapeada em {src_path}, descartadas.")
+        
+    np.savetxt(
+        dst_path,
+        np.column_stack([cls[keep], arr[keep, 1:]]),
+        fmt=['%d'] + ['%.6f'] * (arr.shape[1] - 1)
+    )
+    return True
+
+
+def _dump_dataset_yaml(config: Dict[str, Any], path: Path) -> None:
+    """Escrever dataset.yaml diretamente (chaves planas + names), sem PyYAML
+    
+    Strings JSON são escalares YAML válidos (aspas duplas), então nomes de
+    classes com caracteres especiais continuam sendo lidos corretamente.
+    """
+    lines = []
+    for key, value in config.items():
+        if key == 'names':
+            if not value:
+                lines.append("names: {}")
+                continue
+            lines.append("names:")
+            lines.extend(f"  {idx}: {json.dumps(str(name), ensure_ascii=False)}" for idx, name in value.items())
+        else:
+            lines.append(f"{key}: {json.dumps(str(value), ensure_ascii=False)}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _process_split(split: str, dataset_path: Path, norm_root: Path, lut: Optional[np.ndarray]) -> bool:
+    """Symlink de imagens e remapeamento de labels de um split (False se não existir)"""
+    images_dir = dataset_path / 'images' / split
+    labels_dir = dataset_path / 'labels' / split
+    if not images_dir.exists():
+        return False
+        
+    dst_images = norm_root / 'images' / split
+    dst_labels = norm_root / 'labels' / split
+    dst_images.mkdir(parents=True, exist_ok=True)
+    dst_labels.mkdir(parents=True, exist_ok=True)
+    
+    # Symlink imagens
+    _symlink_files(images_dir, dst_images)
+    
+    # Remapear labels em paralelo (I/O libera o GIL; numpy também)
+    if labels_dir.exists():
+        label_files = _iter_label_files(labels_dir)
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as pool:
+            list(pool.map(
+                lambda lbl_file: _remap_label_file(lbl_file, dst_labels / lbl_file.name, lut),
+                label_files
+            ))
+    return True
+
+
+def _process_splits(dataset_path: Path, norm_root: Path, lut: Optional[np.ndarray]) -> List[str]:
+    """Processar train/val/test em paralelo e retornar os splits existentes"""
+    all_splits = ['train', 'val', 'test']
+    with ThreadPoolExecutor(max_workers=len(all_splits)) as pool:
+        present = list(pool.map(lambda split: _process_split(split, dataset_path, norm_root, lut), all_splits))
+    return [split for split, ok in zip(all_splits, present) if ok]
+
+
+@lru_cache(maxsize=4)
+def _load_model_cached(path: str, mtime_ns: int) -> YOLO:
+    """Carregar modelo YOLO com cache (chave inclui mtime para invalidar ao sobrescrever)"""
+    return YOLO(path)
+
+
+def _load_model(model_path: str) -> YOLO:
+    """Obter modelo carregado, reutilizando instâncias em memória"""
+    return _load_model_cached(model_path, os.stat(model_path).st_mtime_ns)
+
+
+def _link_or_copy(src: Path, dst: Path, copy_func: Callable[[Path, Path], Any] = shutil.copy2) -> None:
+    """Criar hardlink de src em dst (mesmo filesystem) ou copiar como fallback"""
+    if dst.exists():
+        dst.unlink()
+    if os.stat(src).st_dev == os.stat(dst.parent).st_dev:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass
+    copy_func(src, dst)
+
+
+def _read_results_rows(results_csv: Path) -> List[Dict[str, float]]:
+    """Linhas completas do results.csv do Ultralytics (uma por época)"""
+    try:
+        lines = results_csv.read_text().splitlines()
+    except FileNotFoundError:
+        return []
+    if len(lines) < 2:
+        return []
+        
+    # Versões antigas alinham o cabeçalho com espaços
+    header = [name.strip() for name in lines[0].split(',')]
+    rows = []
+    for line in lines[1:]:
+        fields = line.split(',')
+        if len(fields) != len(header):
+            # Linha ainda sendo escrita
+            break
+        try:
+            rows.append(dict(zip(header, map(float, fields))))
+        except ValueError:
+            break
+    return rows
+
+
+class _EpochCallback:
+    """Callback de fim de época: extrai métricas e enfileira no loop de origem"""
+    
+    def __init__(self, job_id: str, queue: asyncio.Queue, loop: asyncio.AbstractEventLoop):
+        self.job_id = job_id
+        self.queue = queue
+        self.loop = loop
+        self.start_time = time.monotonic()
+        
+    def on_train_epoch_end(self, trainer):
+        """Callback chamado ao final de cada época"""
+        try:
+            epoch = trainer.epoch + 1
+            epochs = trainer.epochs
+            
+            # Extrair métricas do trainer (ou do validator) em uma passada
+            metrics_dict = (
+                getattr(trainer, 'metrics', None)
+                or getattr(getattr(trainer, 'validator', None), 'metrics', None)
+                or {}
+            )
+            values = dict(zip(_METRIC_FIELDS, (metrics_dict.get(k, 0.0) for k in _METRIC_KEYS)))
+            
+            # Learning rate lido uma vez por época
+            lr = trainer.optimizer.param_groups[0]['lr'] if trainer.optimizer else 0.0
+                
+            # Criar objeto de métricas
+            metrics = TrainingMetrics(
+                epoch=epoch,
+                total_epochs=epochs,
+                **values,
+                learning_rate=lr,
+                elapsed_time=time.monotonic() - self.start_time
+            )
+            
+            # Enfileirar no loop de origem (único enqueue thread-safe por época)
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, metrics)
+            
+            logger.info(f"📊 Época {epoch}/{epochs} - mAP50: {metrics.map50:.3f}, Loss: {metrics.train_loss:.3f}")
+            
+        except Exception as e:
+            logger.error(f"Erro no callback de treinamento: {e}")
+
+
+class _TrainingCancelled(Exception):
+    """Levantada dentro do treinamento quando o job é cancelado"""
+
+
+class _CancelCallback:
+    """Callback de batch/época: interrompe o treinamento quando o job é cancelado"""
+    
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.event = threading.Event()
+        
+    def check(self, trainer):
+        """Parar no próximo batch após o cancelamento (roda na thread de treino)"""
+        if self.event.is_set():
+            trainer.stop = True
+            raise _TrainingCancelled(f"Treinamento do job {self.job_id} cancelado")
+
 
 class YOLOTrainer:
     """Serviço de treinamento YOLO"""
     
     def __init__(self):
+        self.devices: list[int] = []
         self.device = self._get_device()
+        
+        # Modelos recém-treinados por job: (caminho final, modelo, instante)
+        self._post_train_models: "OrderedDict[str, Tuple[str, YOLO, float]]" = OrderedDict()
+        
+        # Modelos base carregados, reutilizados entre jobs (LRU por arquivo)
+        self._model_cache: "OrderedDict[Tuple[str, bool], YOLO]" = OrderedDict()
+        
+        # Thread dedicada à cópia de checkpoints (I/O sobreposto ao restante)
+        self._io_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ckpt-io')
+        
         logger.info(f"🔧 YOLO Trainer inicializado - Device: {self.device}")
+        if not YAML_C_AVAILABLE:
+            logger.warning("⚠️ libyaml não disponível - usando parser YAML puro Python")
         
     def _get_device(self) -> str:
         """Detectar melhor device disponível"""
         if torch.cuda.is_available():
             device = "cuda"
             gpu_count = torch.cuda.device_count()
+            self.devices = list(range(gpu_count))  # Respeita CUDA_VISIBLE_DEVICES
             logger.info(f"🚀 CUDA disponível - {gpu_count} GPU(s) detectada(s)")
+            
+            # Autotuner do cuDNN (imgsz fixo) e TF32 para matmul/conv em Ampere+
+            torch.backends.cudnn.benchmark = True
+            torch.set_float32_matmul_precision('high')
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
         elif hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
             device = "mps"
             logger.info("🍎 MPS (Apple Silicon) disponível")
@@ -62,58 +414,63 @@ class YOLOTrainer:
             # Configurar argumentos de treinamento
             train_args = self._prepare_training_args(job, dataset_config, job_dir)
             
-            # Callback personalizado para capturar métricas
-            class TrainingCallback:
-                def __init__(self, job_id: str, callback_func: Callable):
-                    self.job_id = job_id
-                    self.callback_func = callback_func
-                    self.start_time = datetime.now()
-                    
-                def on_train_epoch_end(self, trainer):
-                    """Callback chamado ao final de cada época"""
-                    try:
-                        epoch = trainer.epoch + 1
-                        epochs = trainer.epochs
-                        
-                        # Extrair métricas do trainer
-                        metrics_dict = {}
-                        if hasattr(trainer, 'metrics') and trainer.metrics:
-                            metrics_dict = trainer.metrics
-                        elif hasattr(trainer, 'validator') and trainer.validator and hasattr(trainer.validator, 'metrics'):
-                            metrics_dict = trainer.validator.metrics
-                            
-                        # Criar objeto de métricas
-                        metrics = TrainingMetrics(
-                            epoch=epoch,
-                            total_epochs=epochs,
-                            train_loss=metrics_dict.get('train/box_loss', 0.0),
-                            val_loss=metrics_dict.get('val/box_loss', 0.0),
-                            precision=metrics_dict.get('metrics/precision(B)', 0.0),
-                            recall=metrics_dict.get('metrics/recall(B)', 0.0),
-                            map50=metrics_dict.get('metrics/mAP50(B)', 0.0),
-                            map50_95=metrics_dict.get('metrics/mAP50-95(B)', 0.0),
-                            learning_rate=trainer.optimizer.param_groups[0]['lr'] if trainer.optimizer else 0.0,
-                            elapsed_time=(datetime.now() - self.start_time).total_seconds()
-                        )
-                        
-                        # Chamar callback assíncrono
-                        asyncio.create_task(self.callback_func(metrics))
-                        
-                        logger.info(f"📊 Época {epoch}/{epochs} - mAP50: {metrics.map50:.3f}, Loss: {metrics.train_loss:.3f}")
-                        
-                    except Exception as e:
-                        logger.error(f"Erro no callback de treinamento: {e}")
-                        
-            # Adicionar callback
-            callback = TrainingCallback(job.id, progress_callback)
-            model.add_callback("on_train_epoch_end", callback.on_train_epoch_end)
+            # Loop de origem: o treinamento roda em thread e enfileira métricas para cá,
+            # onde um único consumidor as entrega em ordem ao progress_callback
+            loop = asyncio.get_running_loop()
+            metrics_queue: asyncio.Queue = asyncio.Queue()
+            consumer = asyncio.create_task(self._consume_metrics(job.id, metrics_queue, progress_callback))
+            
+            # DDP treina em subprocessos, onde os callbacks deste processo não
+            # rodam: as métricas por época vêm do results.csv
+            poller = None
+            training_done = asyncio.Event()
+            if isinstance(train_args['device'], list):
+                results_csv = job_dir / "results.csv"
+                results_csv.unlink(missing_ok=True)
+                poller = asyncio.create_task(
+                    self._poll_results_csv(results_csv, train_args['epochs'], metrics_queue, training_done)
+                )
+            else:
+                callback = _EpochCallback(job.id, metrics_queue, loop)
+                model.add_callback("on_train_epoch_end", callback.on_train_epoch_end)
+            
+            # Cancelar a task não para a thread: o callback interrompe o
+            # treinamento no próximo batch (em DDP só ao fim da execução)
+            cancel_callback = _CancelCallback(job.id)
+            model.add_callback("on_train_batch_end", cancel_callback.check)
+            model.add_callback("on_train_epoch_end", cancel_callback.check)
             
             # Executar treinamento
             logger.info(f"🚀 Iniciando treinamento com {train_args['epochs']} épocas")
-            results = model.train(**train_args)
+            train_future = asyncio.ensure_future(asyncio.to_thread(model.train, **train_args))
+            try:
+                results = await asyncio.shield(train_future)
+            except asyncio.CancelledError:
+                # Manter o slot do job até a thread de treino realmente retornar
+                cancel_callback.event.set()
+                logger.info(f"🛑 Aguardando o treinamento do job {job.id} parar")
+                await asyncio.wait([train_future])
+                if not train_future.cancelled():
+                    train_future.exception()
+                raise
+            finally:
+                # Sinalizar fim e aguardar entrega das métricas pendentes
+                training_done.set()
+                if poller is not None:
+                    await poller
+                metrics_queue.put_nowait(None)
+                await consumer
             
             # Processar resultados
-            return await self._process_results(job, results, job_dir)
+            result = await self._process_results(job, results, job_dir)
+            
+            # Manter modelo treinado (já com best.pt carregado) para validação imediata
+            if result.get("success"):
+                self._store_post_train_model(job.id, result["model_path"], model)
+            else:
+                self._evict_post_train_models()
+                
+            return result
             
         except Exception as e:
             logger.error(f"💥 Erro no treinamento do job {job.id}: {e}")
@@ -122,26 +479,68 @@ class YOLOTrainer:
                 "error": str(e)
             }
             
+    async def _poll_results_csv(self, results_csv: Path, total_epochs: int,
+                                queue: asyncio.Queue, done: asyncio.Event):
+        """Enfileirar métricas de cada nova linha do results.csv até o fim do treino"""
+        start_time = time.monotonic()
+        emitted = 0
+        while True:
+            finished = done.is_set()
+            try:
+                rows = await asyncio.to_thread(_read_results_rows, results_csv)
+            except Exception as e:
+                logger.error(f"Erro ao ler {results_csv}: {e}")
+                rows = []
+                
+            for row in rows[emitted:]:
+                metrics = TrainingMetrics(
+                    epoch=int(row.get('epoch', emitted + 1)),
+                    total_epochs=total_epochs,
+                    **{field: row.get(key, 0.0) for field, key in zip(_METRIC_FIELDS, _METRIC_KEYS)},
+                    learning_rate=row.get('lr/pg0', 0.0),
+                    elapsed_time=time.monotonic() - start_time
+                )
+                queue.put_nowait(metrics)
+                emitted += 1
+                logger.info(f"📊 Época {metrics.epoch}/{total_epochs} - mAP50: {metrics.map50:.3f}, Loss: {metrics.train_loss:.3f}")
+                
+            # Uma última leitura depois do fim pega a época final
+            if finished:
+                break
+            try:
+                await asyncio.wait_for(done.wait(), RESULTS_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+                
+    async def _consume_metrics(self, job_id: str, queue: asyncio.Queue, callback_func: Callable):
+        """Entregar métricas enfileiradas ao callback de progresso, em ordem"""
+        is_async = asyncio.iscoroutinefunction(callback_func)
+        while True:
+            metrics = await queue.get()
+            if metrics is None:
+                break
+            try:
+                if is_async:
+                    await callback_func(metrics)
+                else:
+                    callback_func(metrics)
+            except Exception as e:
+                logger.error(f"Erro no callback de progresso do job {job_id}: {e}")
+                
     def _setup_model(self, model_type: ModelType, pretrained: bool = True) -> YOLO:
         """Configurar modelo YOLO"""
         try:
-            # Mapear tipos de modelo para arquivos
-            model_files = {
-                ModelType.YOLOV8N: "yolov8n.pt" if pretrained else "yolov8n.yaml",
-                ModelType.YOLOV8S: "yolov8s.pt" if pretrained else "yolov8s.yaml", 
-                ModelType.YOLOV8M: "yolov8m.pt" if pretrained else "yolov8m.yaml",
-                ModelType.YOLOV8L: "yolov8l.pt" if pretrained else "yolov8l.yaml",
-                ModelType.YOLOV8X: "yolov8x.pt" if pretrained else "yolov8x.yaml",
-                ModelType.YOLOV9C: "yolov9c.pt" if pretrained else "yolov9c.yaml",
-                ModelType.YOLOV9E: "yolov9e.pt" if pretrained else "yolov9e.yaml",
-                ModelType.YOLOV10N: "yolov10n.pt" if pretrained else "yolov10n.yaml",
-                ModelType.YOLOV10S: "yolov10s.pt" if pretrained else "yolov10s.yaml",
-                ModelType.YOLOV10M: "yolov10m.pt" if pretrained else "yolov10m.yaml",
-                ModelType.YOLOV10L: "yolov10l.pt" if pretrained else "yolov10l.yaml",
-                ModelType.YOLOV10X: "yolov10x.pt" if pretrained else "yolov10x.yaml"
-            }
-            
-            model_file = model_files.get(model_type, "yolov8n.pt")
+            # Pesos pré-treinados (.pt) ou arquitetura sem pesos (.yaml)
+            table = _MODEL_FILES_PT if pretrained else _MODEL_FILES_YAML
+            model_file = table.get(model_type, "yolov8n.pt")
+            
+            # DDP roda em subprocessos que recarregam o modelo; cache não ajuda
+            use_cache = not (settings.ENABLE_MULTI_GPU and len(self.devices) > 1)
+            cache_key = (model_file, pretrained)
+            if use_cache and cache_key in self._model_cache:
+                self._model_cache.move_to_end(cache_key)
+                logger.info(f"📦 Reutilizando modelo em memória: {model_file}")
+                return copy.deepcopy(self._model_cache[cache_key])
             
             logger.info(f"📦 Carregando modelo: {model_file}")
             try:
@@ -155,6 +554,12 @@ class YOLOTrainer:
                 else:
                     raise
             
+            # Guardar cópia intocada (o treinamento altera o modelo retornado)
+            if use_cache:
+                self._model_cache[cache_key] = copy.deepcopy(model)
+                while len(self._model_cache) > MAX_BASE_MODEL_CACHE:
+                    self._model_cache.popitem(last=False)
+            
             return model
             
         except Exception as e:
@@ -162,6 +567,10 @@ class YOLOTrainer:
             raise
             
     async def _prepare_dataset(self, job: TrainingJob, job_dir: Path) -> str:
+        """Preparar configuração do dataset (em thread, fora do event loop)"""
+        return await asyncio.to_thread(self._prepare_dataset_sync, job, job_dir)
+        
+    def _prepare_dataset_sync(self, job: TrainingJob, job_dir: Path) -> str:
         """Preparar configuração do dataset"""
         try:
             dataset_path = Path(job.dataset.path)
@@ -171,7 +580,7 @@ class YOLOTrainer:
             if original_yaml.exists():
                 # Normalizar dataset para garantir índices de classes contínuos e caminhos absolutos
                 with open(original_yaml, 'r') as f:
-                    data = yaml.safe_load(f) or {}
+                    data = yaml.load(f, Loader=_YLoader) or {}
                 original_names = data.get('names', [])
                 names_list: list[str] = []
                 id_map_from_yaml: dict[int, int] = {}
@@ -196,7 +605,7 @@ class YOLOTrainer:
                     for split in ['train', 'val', 'test']:
                         labels_dir = dataset_path / 'labels' / split
                         if labels_dir.exists():
-                            for lbl_file in labels_dir.glob('*.txt'):
+                            for lbl_file in _iter_label_files(labels_dir):
                                 with open(lbl_file, 'r') as lf:
                                     for line in lf:
                                         parts = line.strip().split()
@@ -213,52 +622,9 @@ class YOLOTrainer:
                     else:
                         names_list = [f"class_{i}" for i in sorted_used]
 
-                def remap_label_file(src_path: Path, dst_path: Path):
-                    lines_out = []
-                    if not src_path.exists():
-                        return False
-                    with open(src_path, 'r') as lf:
-                        for line in lf:
-                            parts = line.strip().split()
-                            if not parts:
-                                continue
-                            try:
-                                orig_cls = int(parts[0])
-                            except ValueError:
-                                lines_out.append(line)
-                                continue
-                            if orig_cls in class_mapping:
-                                parts[0] = str(class_mapping[orig_cls])
-                            else:
-                                logger.warning(f"Classe {orig_cls} não mapeada em {src_path}, descartando anotação.")
-                                continue
-                            lines_out.append(" ".join(parts) + "\n")
-                    dst_path.parent.mkdir(parents=True, exist_ok=True)
-                    with open(dst_path, 'w') as df:
-                        df.writelines(lines_out)
-                    return True
-
-                splits = []
-                for split in ['train', 'val', 'test']:
-                    images_dir = dataset_path / 'images' / split
-                    labels_dir = dataset_path / 'labels' / split
-                    if images_dir.exists():
-                        splits.append(split)
-                        (norm_root / 'images' / split).mkdir(parents=True, exist_ok=True)
-                        (norm_root / 'labels' / split).mkdir(parents=True, exist_ok=True)
-                        for img_file in images_dir.glob('*'):
-                            if img_file.is_file():
-                                dst = norm_root / 'images' / split / img_file.name
-                                try:
-                                    if dst.exists():
-                                        dst.unlink()
-                                    os.symlink(img_file, dst)
-                                except Exception:
-                                    shutil.copy2(img_file, dst)
-                        if labels_dir.exists():
-                            for lbl_file in labels_dir.glob('*.txt'):
-                                dst_lbl = norm_root / 'labels' / split / lbl_file.name
-                                remap_label_file(lbl_file, dst_lbl)
+                lut = _build_class_lut(class_mapping)
+
+                splits = _process_splits(dataset_path, norm_root, lut)
 
                 names_dict = {i: name for i, name in enumerate(names_list)} if names_list else {}
                 job_yaml = job_dir / "dataset.yaml"
@@ -272,8 +638,7 @@ class YOLOTrainer:
                 if names_dict:
                     config['names'] = names_dict
                 config = {k: v for k, v in config.items() if v is not None}
-                with open(job_yaml, 'w') as f:
-                    yaml.dump(config, f, default_flow_style=False)
+                _dump_dataset_yaml(config, job_yaml)
                 return str(job_yaml)
 
                 
@@ -287,67 +652,18 @@ class YOLOTrainer:
                 class_mapping: dict[int, int] = {}
                 mapping_possible = True
                 for new_idx, name in enumerate(job.dataset.classes):
-                    m = re.search(r"(\d+)$", str(name))
+                    m = _TRAIL_DIGITS.search(str(name))
                     if not m:
                         mapping_possible = False
                         break
                     orig_id = int(m.group(1))
                     class_mapping[orig_id] = new_idx
                 
-                # Função para remapear um arquivo de label
-                def remap_label_file(src_path: Path, dst_path: Path):
-                    lines_out = []
-                    if not src_path.exists():
-                        return False
-                    with open(src_path, 'r') as f:
-                        for line in f:
-                            parts = line.strip().split()
-                            if not parts:
-                                continue
-                            try:
-                                orig_cls = int(parts[0])
-                            except ValueError:
-                                # Mantém linha se não conseguir interpretar índice
-                                lines_out.append(line)
-                                continue
-                            if mapping_possible and orig_cls in class_mapping:
-                                parts[0] = str(class_mapping[orig_cls])
-                            elif mapping_possible:
-                                # Índice fora do conjunto conhecido; registrar e descartar a anotação
-                                logger.warning(f"Label com classe inválida {orig_cls} em {src_path}, descartando anotação.")
-                                continue
-                            lines_out.append(" ".join(parts) + "\n")
-                    dst_path.parent.mkdir(parents=True, exist_ok=True)
-                    with open(dst_path, 'w') as f:
-                        f.writelines(lines_out)
-                    return True
+                # Tabela de remapeamento (None mantém índices originais)
+                lut = _build_class_lut(class_mapping) if mapping_possible else None
                 
                 # Copiar imagens (symlinks) e remapear labels para cada split existente
-                splits = []
-                for split in ['train', 'val', 'test']:
-                    images_dir = dataset_path / 'images' / split
-                    labels_dir = dataset_path / 'labels' / split
-                    if images_dir.exists():
-                        splits.append(split)
-                        # Preparar diretórios
-                        (norm_root / 'images' / split).mkdir(parents=True, exist_ok=True)
-                        (norm_root / 'labels' / split).mkdir(parents=True, exist_ok=True)
-                        # Symlink imagens
-                        for img_file in images_dir.glob('*'):
-                            if img_file.is_file():
-                                dst = norm_root / 'images' / split / img_file.name
-                                try:
-                                    if dst.exists():
-                                        dst.unlink()
-                                    os.symlink(img_file, dst)
-                                except Exception:
-                                    # fallback: copiar arquivo
-                                    shutil.copy2(img_file, dst)
-                        # Remapear labels
-                        if labels_dir.exists():
-                            for lbl_file in labels_dir.glob('*.txt'):
-                                dst_lbl = norm_root / 'labels' / split / lbl_file.name
-                                remap_label_file(lbl_file, dst_lbl)
+                splits = _process_splits(dataset_path, norm_root, lut)
                 
                 # Configuração do dataset.yaml para o dataset normalizado
                 names_dict = {i: name for i, name in enumerate(job.dataset.classes)}
@@ -364,8 +680,7 @@ class YOLOTrainer:
                     config['test'] = str(norm_root / 'images' / 'test')
                     
                 job_yaml = job_dir / "dataset.yaml"
-                with open(job_yaml, 'w') as f:
-                    yaml.dump(config, f, default_flow_style=False)
+                _dump_dataset_yaml(config, job_yaml)
                     
                 return str(job_yaml)
                 
@@ -388,9 +703,11 @@ class YOLOTrainer:
             'exist_ok': True,
             'save': True,
             'save_period': max(1, config.epochs // 10),  # Salvar a cada 10% das épocas
-            'cache': False,  # Desabilitar cache para economizar memória
-            'workers': min(8, config.batch_size),
+            'cache': self._select_cache_mode(getattr(config, 'cache', None)),
+            'workers': min(os.cpu_count() or 1, settings.MAX_DATALOADER_WORKERS),
             'patience': config.patience,
+            # Sem mosaic nos últimos ~10% das épocas (ao menos 1, nunca o treino todo)
+            'close_mosaic': min(max(1, round(config.epochs * 0.1)), max(0, config.epochs - 1)),
             'verbose': True
         }
         
@@ -421,11 +738,36 @@ class YOLOTrainer:
         # Configurações específicas do device
         if self.device == "cuda":
             args['amp'] = True  # Automatic Mixed Precision
+            args['half'] = False  # Precisão controlada pelo AMP
+            
+            # Multi-GPU: lista de devices ativa o launcher DDP do Ultralytics;
+            # batch é global, então escala para manter o batch por GPU
+            if settings.ENABLE_MULTI_GPU and len(self.devices) > 1:
+                args['device'] = self.devices
+                args['batch'] = config.batch_size * len(self.devices)
+                logger.info(f"🔀 Treinamento DDP em {len(self.devices)} GPUs")
+            
+            # Compilação com TorchInductor (fallback para eager se indisponível)
+            if settings.ENABLE_TORCH_COMPILE:
+                if COMPILE_AVAILABLE:
+                    args['compile'] = True
+                else:
+                    logger.info("ℹ️ torch.compile indisponível nesta versão - treinando em modo eager")
             
         return args
         
+    def _select_cache_mode(self, requested: Optional[str]):
+        """Escolher cache de imagens do dataloader
+        
+        Sem cache por padrão: 'ram' e 'disk' são opt-in explícitos do job, pois
+        o cache guarda imagens decodificadas (várias vezes o tamanho em disco).
+        """
+        if requested in ("ram", "disk"):
+            return requested
+        return False
+        
     async def _process_results(self, job: TrainingJob, results, job_dir: Path) -> Dict[str, Any]:
-        """Processar resultados do treinamento"""
+        """Processar resultados do treinamento (cópias no pool de I/O, aguardadas sem bloquear o loop)"""
         try:
             # Caminhos dos arquivos gerados
             runs_dir = job_dir.parent / job.id
@@ -438,6 +780,20 @@ class YOLOTrainer:
             if not best_weights.exists():
                 raise FileNotFoundError("Arquivo best.pt não foi gerado")
                 
+            # Copiar arquivos importantes para local permanente (em background)
+            models_dir = settings.MODELS_DIR / job.id
+            models_dir.mkdir(parents=True, exist_ok=True)
+            
+            final_model_path = models_dir / "best.pt"
+            pending = [asyncio.wrap_future(self._io_pool.submit(_link_or_copy, best_weights, final_model_path, copy_file_fast))]
+            
+            # Copiar logs se existirem
+            logs_path = None
+            results_csv = runs_dir / "results.csv"
+            if results_csv.exists():
+                logs_path = models_dir / "results.csv"
+                pending.append(asyncio.wrap_future(self._io_pool.submit(_link_or_copy, results_csv, logs_path, copy_file_fast)))
+                
             # Extrair métricas finais
             best_metrics = None
             if hasattr(results, 'results_dict'):
@@ -450,19 +806,8 @@ class YOLOTrainer:
                     'final_loss': metrics_dict.get('train/box_loss', 0.0)
                 }
                 
-            # Copiar arquivos importantes para local permanente
-            models_dir = settings.MODELS_DIR / job.id
-            models_dir.mkdir(parents=True, exist_ok=True)
-            
-            final_model_path = models_dir / "best.pt"
-            shutil.copy2(best_weights, final_model_path)
-            
-            # Copiar logs se existirem
-            logs_path = None
-            results_csv = runs_dir / "results.csv"
-            if results_csv.exists():
-                logs_path = models_dir / "results.csv"
-                shutil.copy2(results_csv, logs_path)
+            # Aguardar cópias apenas se ainda não terminaram (propaga erros)
+            await asyncio.gather(*pending)
                 
             logger.info(f"✅ Treinamento concluído - Modelo salvo em: {final_model_path}")
             
@@ -482,10 +827,48 @@ class YOLOTrainer:
                 "error": f"Erro ao processar resultados: {str(e)}"
             }
             
+    def cleanup(self):
+        """Liberar recursos do trainer (aguarda cópias de checkpoint em andamento)"""
+        self._io_pool.shutdown(wait=True)
+        self.clear_model_cache()
+        
+    def clear_model_cache(self):
+        """Descartar modelos carregados em cache"""
+        _load_model_cached.cache_clear()
+        self._post_train_models.clear()
+        self._model_cache.clear()
+        
+    def _evict_post_train_models(self):
+        """Remover modelos pós-treino expirados"""
+        now = time.monotonic()
+        expired = [
+            job_id for job_id, (_, _, ts) in self._post_train_models.items()
+            if now - ts > POST_TRAIN_MODEL_TTL
+        ]
+        for job_id in expired:
+            del self._post_train_models[job_id]
+            
+    def _store_post_train_model(self, job_id: str, model_path: str, model: YOLO):
+        """Guardar o modelo de um job concluído, sem o estado de treinamento"""
+        # Otimizador, EMA e dataloaders ficam no trainer: não reter na memória
+        model.trainer = None
+        self._evict_post_train_models()
+        self._post_train_models[job_id] = (model_path, model, time.monotonic())
+        while len(self._post_train_models) > MAX_POST_TRAIN_MODELS:
+            self._post_train_models.popitem(last=False)
+            
+    def _get_post_train_model(self, model_path: str) -> Optional[YOLO]:
+        """Obter modelo em memória correspondente ao caminho final de um job"""
+        self._evict_post_train_models()
+        for path, model, _ in self._post_train_models.values():
+            if path == model_path:
+                return model
+        return None
+        
     async def validate_model(self, model_path: str, dataset_config: str) -> Dict[str, Any]:
         """Validar modelo treinado"""
         try:
-            model = YOLO(model_path)
+            model = self._get_post_train_model(model_path) or _load_model(model_path)
             results = model.val(data=dataset_config, device=self.device)
             
             return {
@@ -508,7 +891,7 @@ class YOLOTrainer:
     async def predict(self, model_path: str, source: str, **kwargs) -> Dict[str, Any]:
         """Executar inferência com modelo treinado"""
         try:
-            model = YOLO(model_path)
+            model = _load_model(model_path)
             results = model.predict(source=source, device=self.device, **kwargs)
             
             return {
@@ -526,7 +909,7 @@ class YOLOTrainer:
     def get_model_info(self, model_path: str) -> Dict[str, Any]:
         """Obter informações do modelo"""
         try:
-            model = YOLO(model_path)
+            model = _load_model(model_path)
             
             return {
                 "success": True,
@@ -543,4 +926,15 @@ class YOLOTrainer:
             return {
                 "success": False,
                 "error": str(e)
-            }
\ No newline at end of file
+            }
+
+
+_TRAINER: Optional[YOLOTrainer] = None
+
+
+def get_yolo_trainer() -> YOLOTrainer:
+    """Instância única do trainer, compartilhada por jobs e roteadores"""
+    global _TRAINER
+    if _TRAINER is None:
+        _TRAINER = YOLOTrainer()
+    return _TRAINER
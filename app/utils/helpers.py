@@ -2,24 +2,88 @@
 Funções auxiliares e utilitários
 """
 
+import errno
 import os
+import re
 import json
-import yaml
+import marshal
 import hashlib
+import secrets
+import shutil
+import time
 import asyncio
+import atexit
+import threading
+import warnings
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Union
-from datetime import datetime, timedelta
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple, Union
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from blake3 import blake3 as _fast_hash
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+# Tamanho do buffer de leitura para hash de arquivos
+HASH_CHUNK_SIZE = 1 << 20
+
+# Dicas de page cache na cópia de arquivos (Linux e outros POSIX)
+_FADVISE = hasattr(os, "posix_fadvise")
+
+# Extensões reconhecidas (comparadas em minúsculas, com o ponto)
+_IMG_EXT_FROZEN = frozenset({'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.webp', '.gif'})
+_VIDEO_EXT_FROZEN = frozenset({'.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm', '.m4v'})
+
+# Pool de I/O compartilhado pelos helpers (varredura de diretórios)
+SCAN_MAX_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+_LABEL_EXT = frozenset({'.txt'})
+_NO_IDS = np.empty(0, dtype=np.int32)
+
+# Limpeza de nomes: tabela de tradução para caracteres inválidos e um único
+# regex para colapsar espaços/underscores
+_CLEAN_TBL = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
+_MULTI_US = re.compile(r'[_\s]+')
+
+# Cache em disco para YAML já parseado, em diretório do servidor (nunca ao
+# lado dos datasets enviados); desligado por padrão
+YAML_CACHE_DIR = os.environ.get("HELPERS_YAML_CACHE_DIR") or None
+
+
+@lru_cache(maxsize=None)
+def _yaml_api() -> tuple:
+    """Importar PyYAML sob demanda: (módulo, loader, dumper), em C quando disponível"""
+    import yaml
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    return yaml, loader, dumper
+
+
+def __getattr__(name: str) -> Any:
+    """Compatibilidade: `helpers.yaml` continua acessível (PEP 562)"""
+    if name == "yaml":
+        return _yaml_api()[0]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def generate_job_id() -> str:
     """Gerar ID único para job"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    random_hash = hashlib.md5(str(datetime.now().timestamp()).encode()).hexdigest()[:8]
-    return f"job_{timestamp}_{random_hash}"
+    return f"job_{time.strftime('%Y%m%d_%H%M%S')}_{secrets.token_hex(4)}"
 
 
 def format_bytes(bytes_value: int) -> str:
@@ -60,11 +124,19 @@ def calculate_eta(current_epoch: int, total_epochs: int, elapsed_time: float) ->
     return remaining_epochs * time_per_epoch
 
 
+@lru_cache(maxsize=128)
+def _load_json_cached(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse de JSON em cache (chave inclui mtime/tamanho para invalidar ao alterar)"""
+    # Leitura binária direta, sem TextIOWrapper
+    data = Path(path).read_bytes()
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
 def safe_json_load(file_path: Union[str, Path]) -> Dict[str, Any]:
-    """Carregar JSON com tratamento de erro"""
+    """Carregar JSON com tratamento de erro (resultado compartilhado; não mutar)"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        st = os.stat(file_path)
+        return _load_json_cached(str(file_path), st.st_mtime_ns, st.st_size)
     except Exception as e:
         logger.warning(f"Erro ao carregar JSON {file_path}: {e}")
         return {}
@@ -76,6 +148,14 @@ def safe_json_save(data: Dict[str, Any], file_path: Union[str, Path]) -> bool:
         # Criar diretório se não existir
         Path(file_path).parent.mkdir(parents=True, exist_ok=True)
         
+        if ORJSON_AVAILABLE:
+            Path(file_path).write_bytes(orjson.dumps(
+                data,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+                default=str
+            ))
+            return True
+            
         with open(file_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, ensure_ascii=False, default=str)
         return True
@@ -84,24 +164,66 @@ def safe_json_save(data: Dict[str, Any], file_path: Union[str, Path]) -> bool:
         return False
 
 
+@lru_cache(maxsize=128)
+def _load_yaml_cached(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse de YAML em cache (chave inclui mtime/tamanho para invalidar ao alterar)"""
+    yaml, loader, _ = _yaml_api()
+    if YAML_CACHE_DIR is None:
+        with open(path, 'r', encoding='utf-8') as f:
+            return yaml.load(f, Loader=loader) or {}
+    
+    # marshal só reconstrói dados simples (não executa código, ao contrário
+    # do pickle); a chave já inclui caminho, mtime e tamanho
+    key = hashlib.blake2b(f"{os.path.abspath(path)}\0{mtime_ns}\0{size}".encode(), digest_size=16).hexdigest()
+    cache_path = os.path.join(YAML_CACHE_DIR, key + ".marshal")
+    try:
+        with open(cache_path, 'rb') as f:
+            return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        data = yaml.load(f, Loader=loader) or {}
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(YAML_CACHE_DIR, mode=0o700, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            marshal.dump(data, f)
+        os.replace(tmp_path, cache_path)
+    except (OSError, ValueError) as e:
+        # ValueError: tipo não suportado pelo marshal (ex.: datas do YAML)
+        logger.debug(f"Não foi possível gravar cache de {path}: {e}")
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+    return data
+
+
 def safe_yaml_load(file_path: Union[str, Path]) -> Dict[str, Any]:
-    """Carregar YAML com tratamento de erro"""
+    """Carregar YAML com tratamento de erro (resultado compartilhado; não mutar)"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f) or {}
+        st = os.stat(file_path)
+        return _load_yaml_cached(str(file_path), st.st_mtime_ns, st.st_size)
     except Exception as e:
         logger.warning(f"Erro ao carregar YAML {file_path}: {e}")
         return {}
 
 
+# Invalidação manual dos caches de leitura
+safe_json_load.cache_clear = _load_json_cached.cache_clear
+safe_yaml_load.cache_clear = _load_yaml_cached.cache_clear
+
+
 def safe_yaml_save(data: Dict[str, Any], file_path: Union[str, Path]) -> bool:
     """Salvar YAML com tratamento de erro"""
     try:
         # Criar diretório se não existir
         Path(file_path).parent.mkdir(parents=True, exist_ok=True)
         
+        yaml, _, dumper = _yaml_api()
         with open(file_path, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f, default_flow_style=False, allow_unicode=True)
+            yaml.dump(data, f, Dumper=dumper, default_flow_style=False, allow_unicode=True)
         return True
     except Exception as e:
         logger.error(f"Erro ao salvar YAML {file_path}: {e}")
@@ -117,60 +239,176 @@ def ensure_directory(path: Union[str, Path]) -> Path:
 
 def clean_filename(filename: str) -> str:
     """Limpar nome de arquivo removendo caracteres inválidos"""
-    import re
-    # Remover caracteres especiais
-    cleaned = re.sub(r'[<>:"/\\|?*]', '_', filename)
-    # Remover espaços múltiplos
-    cleaned = re.sub(r'\s+', '_', cleaned)
-    # Remover underscores múltiplos
-    cleaned = re.sub(r'_+', '_', cleaned)
-    # Remover underscore no início/fim
-    cleaned = cleaned.strip('_')
-    return cleaned
-
-
-def get_file_hash(file_path: Union[str, Path], algorithm: str = "md5") -> str:
-    """Calcular hash de arquivo"""
-    hash_func = hashlib.new(algorithm)
+    return _MULTI_US.sub('_', filename.translate(_CLEAN_TBL)).strip('_')
+
+
+def copy_file_fast(src: Union[str, Path], dst: Union[str, Path], chunk: int = 64 << 20) -> None:
+    """Copiar arquivo com metadados (como shutil.copy2), inteiramente no kernel
+    
+    copy_file_range evita trazer os dados ao espaço do usuário (e vira reflink
+    em btrfs/XFS); sem ele, ou entre filesystems, shutil.copy2 já usa o caminho
+    rápido da plataforma (sendfile no Linux, fcopyfile no macOS).
+    """
+    if not hasattr(os, "copy_file_range"):
+        shutil.copy2(src, dst)
+        return
+    
+    st = os.stat(src)
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        if _FADVISE:
+            os.posix_fadvise(src_fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, st.st_mode & 0o777)
+        try:
+            offset = 0
+            while offset < st.st_size:
+                copied = os.copy_file_range(src_fd, dst_fd, chunk)
+                if copied == 0:
+                    break
+                offset += copied
+            if _FADVISE:
+                # Páginas da origem não serão relidas: não expulsar do cache
+                # o dataset de um treinamento em andamento por causa delas
+                os.posix_fadvise(src_fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError as e:
+            # Entre filesystems ou sem suporte do kernel: cópia padrão
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+            offset = -1
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+    
+    # Retorno 0 antes do fim (alguns FUSE/NFS) também cai na cópia padrão,
+    # em vez de deixar o destino truncado
+    if offset != st.st_size:
+        shutil.copy2(src, dst)
+        return
+    
+    # Preservar metadados (permissões, timestamps) como o copy2
+    shutil.copystat(src, dst)
+
+
+def get_file_hash(file_path: Union[str, Path], algorithm: str = "sha256") -> str:
+    """Calcular hash de arquivo (SHA-256 por padrão; "blake3" exige o pacote blake3)
+    
+    Sem fallback silencioso: o mesmo algoritmo produz o mesmo digest em
+    qualquer ambiente, então hashes persistidos continuam comparáveis.
+    """
+    if algorithm == "blake3":
+        if not BLAKE3_AVAILABLE:
+            raise ValueError("Algoritmo blake3 indisponível: instale o pacote 'blake3'")
+        hash_func = _fast_hash()
+    else:
+        hash_func = hashlib.new(algorithm)
     
     try:
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_func.update(chunk)
+        # Python 3.11+: laço de leitura da stdlib (readinto em buffer único)
+        if hasattr(hashlib, "file_digest"):
+            with open(file_path, 'rb') as f:
+                return hashlib.file_digest(f, lambda: hash_func).hexdigest()
+        
+        # Buffer reutilizado entre leituras (sem alocar bytes por bloco)
+        buf = bytearray(HASH_CHUNK_SIZE)
+        view = memoryview(buf)
+        with open(file_path, 'rb', buffering=0) as f:
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                hash_func.update(view[:n])
         return hash_func.hexdigest()
     except Exception as e:
         logger.error(f"Erro ao calcular hash de {file_path}: {e}")
         return ""
 
 
+def _has_extension(file_path: Union[str, Path], extensions: frozenset) -> bool:
+    """Checar extensão fatiando a string, sem construir Path"""
+    s = file_path if isinstance(file_path, str) else os.fspath(file_path)
+    i = s.rfind('.')
+    # Ponto em um diretório do caminho não é extensão
+    return i > s.rfind(os.sep) + 1 and s[i:].lower() in extensions
+
+
 def is_image_file(file_path: Union[str, Path]) -> bool:
     """Verificar se arquivo é uma imagem"""
-    image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.webp', '.gif'}
-    return Path(file_path).suffix.lower() in image_extensions
+    return _has_extension(file_path, _IMG_EXT_FROZEN)
 
 
 def is_video_file(file_path: Union[str, Path]) -> bool:
     """Verificar se arquivo é um vídeo"""
-    video_extensions = {'.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm', '.m4v'}
-    return Path(file_path).suffix.lower() in video_extensions
+    return _has_extension(file_path, _VIDEO_EXT_FROZEN)
 
 
-def get_image_files(directory: Union[str, Path]) -> List[Path]:
-    """Obter lista de arquivos de imagem em diretório"""
-    directory = Path(directory)
-    if not directory.exists():
+def _get_executor() -> ThreadPoolExecutor:
+    """Pool compartilhado de I/O, criado no primeiro uso"""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(max_workers=SCAN_MAX_WORKERS, thread_name_prefix="helpers-io")
+                atexit.register(_EXECUTOR.shutdown, wait=False)
+    return _EXECUTOR
+
+
+def _scan_dir(path: str, extensions: frozenset) -> tuple:
+    """Ler um diretório: (arquivos com extensão aceita, subdiretórios)"""
+    files, subdirs = [], []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                    continue
+                # Filtra a extensão no nome bruto antes de criar qualquer Path
+                name = entry.name
+                dot = name.rfind('.')
+                if dot >= 0 and name[dot:].lower() in extensions and entry.is_file():
+                    files.append(entry.path)
+    except OSError as e:
+        logger.warning(f"Erro ao listar {path}: {e}")
+    return files, subdirs
+
+
+def _scan_files(directory: Union[str, Path], extensions: frozenset, recursive: bool = True) -> List[str]:
+    """Listar arquivos por extensão em BFS, lendo cada nível de diretórios em paralelo"""
+    if not os.path.isdir(directory):
         return []
     
-    image_files = []
-    for file_path in directory.rglob('*'):
-        if file_path.is_file() and is_image_file(file_path):
-            image_files.append(file_path)
+    found = []
+    level = [os.fspath(directory)]
+    while level:
+        if len(level) == 1:
+            results = [_scan_dir(level[0], extensions)]
+        else:
+            results = _get_executor().map(_scan_dir, level, [extensions] * len(level))
+        
+        next_level = []
+        for files, subdirs in results:
+            found.extend(files)
+            next_level.extend(subdirs)
+        level = next_level if recursive else []
     
-    return sorted(image_files)
+    return found
+
+
+# Pré-criar o pool na importação (útil antes de fork dos workers)
+if os.environ.get("HELPERS_EAGER_POOL") == "1":
+    _get_executor()
 
 
-def validate_yolo_dataset(dataset_path: Union[str, Path]) -> Dict[str, Any]:
-    """Validar estrutura de dataset YOLO"""
+def get_image_files(directory: Union[str, Path]) -> List[Path]:
+    """Obter lista de arquivos de imagem em diretório"""
+    return [Path(p) for p in sorted(_scan_files(directory, _IMG_EXT_FROZEN))]
+
+
+def validate_yolo_dataset(dataset_path: Union[str, Path], mode: str = "full") -> Dict[str, Any]:
+    """Validar estrutura de dataset YOLO
+    
+    mode="fast" verifica apenas diretórios e data.yaml, sem listar arquivos
+    """
     dataset_path = Path(dataset_path)
     result = {
         "valid": False,
@@ -179,35 +417,41 @@ def validate_yolo_dataset(dataset_path: Union[str, Path]) -> Dict[str, Any]:
     }
     
     try:
-        # Verificar estrutura básica
+        # Verificar estrutura básica; uma listagem de images/ e labels/
+        # informa quais splits existem, sem um stat por split
         required_dirs = ["images", "labels"]
+        split_dirs = {}
         for dir_name in required_dirs:
-            dir_path = dataset_path / dir_name
-            if not dir_path.exists():
+            try:
+                with os.scandir(dataset_path / dir_name) as entries:
+                    split_dirs[dir_name] = {e.name for e in entries if e.is_dir()}
+            except (FileNotFoundError, NotADirectoryError):
+                split_dirs[dir_name] = set()
                 result["issues"].append(f"Diretório obrigatório não encontrado: {dir_name}")
+        img_splits, label_splits = split_dirs["images"], split_dirs["labels"]
         
         # Verificar splits
         splits = ["train"]  # train é obrigatório
         optional_splits = ["val", "test"]
         
-        for split in splits + optional_splits:
-            images_dir = dataset_path / "images" / split
-            labels_dir = dataset_path / "labels" / split
-            
-            if images_dir.exists():
-                image_files = get_image_files(images_dir)
-                label_files = list(labels_dir.glob("*.txt")) if labels_dir.exists() else []
+        # No modo rápido não há contagem/correspondência de arquivos
+        for split in (splits + optional_splits if mode != "fast" else []):
+            if split in img_splits:
+                image_files = get_image_files(dataset_path / "images" / split)
+                label_files = (
+                    [Path(p) for p in _scan_files(dataset_path / "labels" / split, _LABEL_EXT, recursive=False)]
+                    if split in label_splits else []
+                )
                 
                 result["statistics"][f"{split}_images"] = len(image_files)
                 result["statistics"][f"{split}_labels"] = len(label_files)
                 
-                # Verificar correspondência
-                if labels_dir.exists():
+                # Verificar correspondência (diferença simétrica em uma passada)
+                if split in label_splits:
                     image_stems = {f.stem for f in image_files}
-                    label_stems = {f.stem for f in label_files}
-                    
-                    missing_labels = image_stems - label_stems
-                    missing_images = label_stems - image_stems
+                    missing_labels, missing_images = set(), set()
+                    for stem in image_stems.symmetric_difference(f.stem for f in label_files):
+                        (missing_labels if stem in image_stems else missing_images).add(stem)
                     
                     if missing_labels:
                         result["issues"].append(f"{split}: {len(missing_labels)} imagens sem labels")
@@ -249,6 +493,11 @@ def validate_yolo_dataset(dataset_path: Union[str, Path]) -> Dict[str, Any]:
     return result
 
 
+def quick_validate_yolo_dataset(dataset_path: Union[str, Path]) -> Dict[str, Any]:
+    """Validação rápida (estrutura + data.yaml), para quem só precisa de `valid`"""
+    return validate_yolo_dataset(dataset_path, mode="fast")
+
+
 def create_yolo_yaml(
     dataset_path: Union[str, Path],
     class_names: List[str],
@@ -279,47 +528,97 @@ def create_yolo_yaml(
         return False
 
 
+def _loadtxt(path: Union[str, Path], **kwargs) -> np.ndarray:
+    """np.loadtxt silenciando o aviso de arquivo vazio"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        return np.loadtxt(path, **kwargs)
+
+
+def load_yolo_labels(annotation_path: Union[str, Path]) -> Dict[str, np.ndarray]:
+    """Carregar labels YOLO em arrays (SoA): class_id (N,) e boxes (N, 4)"""
+    try:
+        # usecols tolera linhas com pontos de segmentação extras
+        arr = _loadtxt(annotation_path, usecols=range(5), ndmin=2, dtype=np.float32)
+    except ValueError:
+        # Linhas com menos de 5 colunas: caminho linha a linha
+        rows = [
+            [ann["class_id"], ann["x_center"], ann["y_center"], ann["width"], ann["height"]]
+            for ann in parse_yolo_annotation(annotation_path)
+        ]
+        arr = np.array(rows, dtype=np.float32).reshape(-1, 5)
+    except Exception as e:
+        logger.error(f"Erro ao parsear anotação {annotation_path}: {e}")
+        arr = np.empty((0, 5), dtype=np.float32)
+    
+    return {"class_id": arr[:, 0].astype(np.int32), "boxes": arr[:, 1:5]}
+
+
 def parse_yolo_annotation(annotation_path: Union[str, Path]) -> List[Dict[str, Any]]:
     """Parsear arquivo de anotação YOLO"""
+    # Caminho rápido: arquivo só com caixas (5 colunas) lido em uma chamada C
+    try:
+        arr = _loadtxt(annotation_path, ndmin=2)
+        if arr.shape[1] == 5:
+            return [
+                {
+                    "class_id": int(c),
+                    "x_center": x,
+                    "y_center": y,
+                    "width": w,
+                    "height": h
+                }
+                for c, x, y, w, h in arr.tolist()
+            ]
+    except Exception:
+        pass
+    
     annotations = []
     
     try:
-        with open(annotation_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
+        # bytes.split() evita decodificar cada linha; int()/float() aceitam bytes
+        for line in Path(annotation_path).read_bytes().splitlines():
+            parts = line.split()
+            if len(parts) >= 5:
+                class_id = int(parts[0])
+                x_center = float(parts[1])
+                y_center = float(parts[2])
+                width = float(parts[3])
+                height = float(parts[4])
+                
+                annotation = {
+                    "class_id": class_id,
+                    "x_center": x_center,
+                    "y_center": y_center,
+                    "width": width,
+                    "height": height
+                }
+                
+                # Adicionar pontos de segmentação se existirem
+                if len(parts) > 5:
+                    points = [float(p) for p in parts[5:]]
+                    if len(points) % 2 == 0:  # Deve ser par (x, y)
+                        annotation["segmentation"] = points
+                
+                annotations.append(annotation)
                 
-                parts = line.split()
-                if len(parts) >= 5:
-                    class_id = int(parts[0])
-                    x_center = float(parts[1])
-                    y_center = float(parts[2])
-                    width = float(parts[3])
-                    height = float(parts[4])
-                    
-                    annotation = {
-                        "class_id": class_id,
-                        "x_center": x_center,
-                        "y_center": y_center,
-                        "width": width,
-                        "height": height
-                    }
-                    
-                    # Adicionar pontos de segmentação se existirem
-                    if len(parts) > 5:
-                        points = [float(p) for p in parts[5:]]
-                        if len(points) % 2 == 0:  # Deve ser par (x, y)
-                            annotation["segmentation"] = points
-                    
-                    annotations.append(annotation)
-                    
     except Exception as e:
         logger.error(f"Erro ao parsear anotação {annotation_path}: {e}")
     
     return annotations
 
 
+def _hist_by_name(hist: np.ndarray, class_names: Dict[Any, str]) -> Dict[str, int]:
+    """Converter histograma por id em contagem por nome de classe"""
+    counts = hist.tolist()
+    by_name = {}
+    for class_id, class_name in class_names.items():
+        by_name[class_name] = by_name.get(class_name, 0) + (
+            counts[class_id] if class_id in range(len(counts)) else 0
+        )
+    return by_name
+
+
 def calculate_dataset_statistics(dataset_path: Union[str, Path]) -> Dict[str, Any]:
     """Calcular estatísticas detalhadas do dataset"""
     dataset_path = Path(dataset_path)
@@ -329,7 +628,7 @@ def calculate_dataset_statistics(dataset_path: Union[str, Path]) -> Dict[str, An
         "splits": {},
         "classes": {},
         "annotation_stats": {
-            "min_objects_per_image": float('inf'),
+            "min_objects_per_image": 0,
             "max_objects_per_image": 0,
             "avg_objects_per_image": 0
         }
@@ -352,6 +651,10 @@ def calculate_dataset_statistics(dataset_path: Union[str, Path]) -> Dict[str, An
             elif isinstance(names, list):
                 class_names = {i: name for i, name in enumerate(names)}
         
+        num_classes = max((k for k in class_names if isinstance(k, int)), default=-1) + 1
+        split_minima, split_maxima = [], []
+        total_hist = np.zeros(num_classes, dtype=np.int64)
+        
         # Analisar cada split
         for split in ["train", "val", "test"]:
             images_dir = dataset_path / "images" / split
@@ -361,52 +664,35 @@ def calculate_dataset_statistics(dataset_path: Union[str, Path]) -> Dict[str, An
                 continue
             
             image_files = get_image_files(images_dir)
+            # Uma listagem do diretório de labels em vez de um stat por imagem
+            label_names = {
+                os.path.basename(p) for p in _scan_files(labels_dir, _LABEL_EXT, recursive=False)
+            }
+            # Ids de classe por imagem (SoA); imagem sem label conta 0 objetos
+            ids_per_image = [
+                load_yolo_labels(labels_dir / name)["class_id"] if name in label_names else _NO_IDS
+                for name in (f"{f.stem}.txt" for f in image_files)
+            ]
+            objects_per_image = np.fromiter(
+                (len(ids) for ids in ids_per_image), dtype=np.int64, count=len(ids_per_image)
+            )
+            all_ids = np.concatenate(ids_per_image) if ids_per_image else _NO_IDS
+            hist = np.bincount(all_ids[all_ids >= 0], minlength=num_classes)[:num_classes]
+            total_hist += hist
+            
             split_stats = {
                 "images": len(image_files),
-                "annotations": 0,
-                "objects_per_class": {}
+                "annotations": int(objects_per_image.sum()),
+                "objects_per_class": _hist_by_name(hist, class_names)
             }
             
-            # Inicializar contadores de classes
-            for class_id, class_name in class_names.items():
-                split_stats["objects_per_class"][class_name] = 0
-            
-            # Analisar anotações
-            objects_per_image = []
-            
-            for image_file in image_files:
-                label_file = labels_dir / f"{image_file.stem}.txt"
-                
-                if label_file.exists():
-                    annotations = parse_yolo_annotation(label_file)
-                    objects_count = len(annotations)
-                    objects_per_image.append(objects_count)
-                    split_stats["annotations"] += objects_count
-                    
-                    # Contar objetos por classe
-                    for ann in annotations:
-                        class_id = ann["class_id"]
-                        if class_id in class_names:
-                            class_name = class_names[class_id]
-                            split_stats["objects_per_class"][class_name] += 1
-                else:
-                    objects_per_image.append(0)
-            
             # Calcular estatísticas de objetos por imagem
-            if objects_per_image:
-                split_stats["min_objects_per_image"] = min(objects_per_image)
-                split_stats["max_objects_per_image"] = max(objects_per_image)
-                split_stats["avg_objects_per_image"] = sum(objects_per_image) / len(objects_per_image)
-                
-                # Atualizar estatísticas globais
-                stats["annotation_stats"]["min_objects_per_image"] = min(
-                    stats["annotation_stats"]["min_objects_per_image"],
-                    split_stats["min_objects_per_image"]
-                )
-                stats["annotation_stats"]["max_objects_per_image"] = max(
-                    stats["annotation_stats"]["max_objects_per_image"],
-                    split_stats["max_objects_per_image"]
-                )
+            if objects_per_image.size:
+                split_stats["min_objects_per_image"] = int(objects_per_image.min())
+                split_stats["max_objects_per_image"] = int(objects_per_image.max())
+                split_stats["avg_objects_per_image"] = float(objects_per_image.mean())
+                split_minima.append(split_stats["min_objects_per_image"])
+                split_maxima.append(split_stats["max_objects_per_image"])
             
             stats["splits"][split] = split_stats
             stats["total_images"] += split_stats["images"]
@@ -416,16 +702,13 @@ def calculate_dataset_statistics(dataset_path: Union[str, Path]) -> Dict[str, An
         if stats["total_images"] > 0:
             stats["annotation_stats"]["avg_objects_per_image"] = stats["total_annotations"] / stats["total_images"]
         
-        # Agregar estatísticas de classes
-        for split_stats in stats["splits"].values():
-            for class_name, count in split_stats["objects_per_class"].items():
-                if class_name not in stats["classes"]:
-                    stats["classes"][class_name] = 0
-                stats["classes"][class_name] += count
+        # Agregar estatísticas de classes (soma dos histogramas dos splits)
+        if stats["splits"]:
+            stats["classes"] = _hist_by_name(total_hist, class_names)
         
-        # Corrigir infinito se não há objetos
-        if stats["annotation_stats"]["min_objects_per_image"] == float('inf'):
-            stats["annotation_stats"]["min_objects_per_image"] = 0
+        if split_minima:
+            stats["annotation_stats"]["min_objects_per_image"] = min(split_minima)
+            stats["annotation_stats"]["max_objects_per_image"] = max(split_maxima)
             
     except Exception as e:
         logger.error(f"Erro ao calcular estatísticas: {e}")
@@ -434,6 +717,43 @@ def calculate_dataset_statistics(dataset_path: Union[str, Path]) -> Dict[str, An
     return stats
 
 
+# Limite do buffer dos pipes de subprocessos (linhas maiores saem em pedaços)
+SUBPROCESS_STREAM_LIMIT = 1 << 20
+
+
+async def _read_output_chunk(stream: asyncio.StreamReader) -> bytes:
+    """Ler uma linha (ou até o limite do buffer); b"" no EOF"""
+    try:
+        return await stream.readuntil(b"\n")
+    except asyncio.IncompleteReadError as e:
+        # EOF: última linha sem quebra (vazia se não houver mais dados)
+        return e.partial
+    except asyncio.LimitOverrunError as e:
+        return await stream.read(e.consumed)
+
+
+async def iter_process_output(process: asyncio.subprocess.Process) -> AsyncIterator[Tuple[str, bytes]]:
+    """Gerar (nome do stream, linha) de stdout/stderr à medida que chegam"""
+    streams = {"stdout": process.stdout, "stderr": process.stderr}
+    pending = {
+        asyncio.ensure_future(_read_output_chunk(stream)): name
+        for name, stream in streams.items() if stream is not None
+    }
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = pending.pop(task)
+                chunk = task.result()
+                if not chunk:
+                    continue
+                yield name, chunk
+                pending[asyncio.ensure_future(_read_output_chunk(streams[name]))] = name
+    finally:
+        for task in pending:
+            task.cancel()
+
+
 async def run_async_command(command: List[str], cwd: Optional[str] = None) -> Dict[str, Any]:
     """Executar comando assíncrono"""
     try:
@@ -441,15 +761,20 @@ async def run_async_command(command: List[str], cwd: Optional[str] = None) -> Di
             *command,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
-            cwd=cwd
+            cwd=cwd,
+            limit=SUBPROCESS_STREAM_LIMIT
         )
         
-        stdout, stderr = await process.communicate()
+        # Saída consumida em streaming e acumulada in-place
+        output = {"stdout": bytearray(), "stderr": bytearray()}
+        async for name, chunk in iter_process_output(process):
+            output[name] += chunk
+        await process.wait()
         
         return {
             "returncode": process.returncode,
-            "stdout": stdout.decode('utf-8', errors='ignore'),
-            "stderr": stderr.decode('utf-8', errors='ignore'),
+            "stdout": output["stdout"].decode('utf-8', errors='ignore'),
+            "stderr": output["stderr"].decode('utf-8', errors='ignore'),
             "success": process.returncode == 0
         }
         
@@ -487,21 +812,32 @@ def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None) -> No
         root_logger.addHandler(file_handler)
 
 
+@lru_cache(maxsize=None)
+def _static_system_info() -> Dict[str, Any]:
+    """Informações que não mudam com o processo em execução"""
+    import platform
+    import psutil
+    
+    return {
+        "platform": platform.platform(),
+        "python_version": platform.python_version(),
+        "cpu_count": psutil.cpu_count()
+    }
+
+
 def get_system_info() -> Dict[str, Any]:
     """Obter informações do sistema"""
-    import platform
     import psutil
     
     try:
+        du = psutil.disk_usage('/')
         return {
-            "platform": platform.platform(),
-            "python_version": platform.python_version(),
-            "cpu_count": psutil.cpu_count(),
+            **_static_system_info(),
             "memory_total": psutil.virtual_memory().total,
             "disk_usage": {
-                "total": psutil.disk_usage('/').total,
-                "used": psutil.disk_usage('/').used,
-                "free": psutil.disk_usage('/').free
+                "total": du.total,
+                "used": du.used,
+                "free": du.free
             }
         }
     except Exception as e:
@@ -2,36 +2,136 @@
 Validadores para dados e configurações
 """
 
+import array
+import copy
+import hashlib
+import os
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
-from pydantic import validator
 import logging
 
+import numpy as np
+import orjson
+
 logger = logging.getLogger(__name__)
 
+# Padrões compilados uma única vez na importação
+_JOB_NAME_RE = re.compile(r'^[a-zA-Z0-9\s\-_\.]+\Z')
+_CUDA_DEVICE_RE = re.compile(r'^cuda:(\d+)\Z')
+
+# Valores aceitos (ordem preservada nas mensagens de erro)
+_MODEL_TYPES = (
+    # YOLOv8
+    "yolov8n", "yolov8s", "yolov8m", "yolov8l", "yolov8x",
+    # YOLOv9
+    "yolov9c", "yolov9e",
+    # YOLOv10
+    "yolov10n", "yolov10s", "yolov10m", "yolov10b", "yolov10l", "yolov10x",
+    # YOLOv11
+    "yolov11n", "yolov11s", "yolov11m", "yolov11l", "yolov11x",
+    # Segmentação
+    "yolov8n-seg", "yolov8s-seg", "yolov8m-seg", "yolov8l-seg", "yolov8x-seg",
+    # Classificação
+    "yolov8n-cls", "yolov8s-cls", "yolov8m-cls", "yolov8l-cls", "yolov8x-cls",
+    # Pose
+    "yolov8n-pose", "yolov8s-pose", "yolov8m-pose", "yolov8l-pose", "yolov8x-pose"
+)
+_OPTIMIZERS = ("SGD", "Adam", "AdamW", "RMSprop", "LBFGS")
+_DEVICES = ("auto", "cpu", "cuda", "mps")
+_EXPORT_FORMATS = (
+    "onnx", "openvino", "engine", "coreml", "saved_model",
+    "pb", "tflite", "edgetpu", "tfjs", "paddle"
+)
+
+_VALID_MODELS = frozenset(_MODEL_TYPES)
+_VALID_OPTIMIZERS = frozenset(_OPTIMIZERS)
+_VALID_DEVICES = frozenset(_DEVICES)
+_VALID_EXPORT_FORMATS = frozenset(_EXPORT_FORMATS)
+
+_VALID_MODELS_MSG = ", ".join(_MODEL_TYPES)
+_VALID_OPTIMIZERS_MSG = ", ".join(_OPTIMIZERS)
+_VALID_DEVICES_MSG = ", ".join(_DEVICES)
+_VALID_EXPORT_FORMATS_MSG = ", ".join(_EXPORT_FORMATS)
+
+# Pool para checagens de sistema de arquivos em paralelo (os.stat libera o GIL)
+_FS_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="validators-fs")
+
+# Estimativa grosseira de memória: ~100MB por imagem no batch para YOLOv8,
+# usando até 80% da memória disponível
+_MEM_PER_IMAGE_MB = 100
+_MEM_HEADROOM = 0.8
+_BATCH_PER_GB = _MEM_HEADROOM * 1024 / _MEM_PER_IMAGE_MB
+
+# Extensões aceitas para arquivos de modelo
+_MODEL_EXTS = ('.pt', '.pth', '.onnx', '.engine', '.tflite')
+_VALID_MODEL_EXTS = frozenset(_MODEL_EXTS)
+_VALID_MODEL_EXTS_MSG = ", ".join(_MODEL_EXTS)
+
+# Extensões (sem ponto, minúsculas) aceitas como imagem de treino
+_TRAIN_IMAGE_EXTS = frozenset({'jpg', 'jpeg', 'png', 'bmp', 'tiff', 'webp'})
+
+# Faixas aceitas para parâmetros de data augmentation
+_AUG_PARAM_RANGES = {
+    "hsv_h": (0.0, 1.0),      # Hue
+    "hsv_s": (0.0, 1.0),      # Saturation
+    "hsv_v": (0.0, 1.0),      # Value
+    "degrees": (0.0, 180.0),   # Rotation
+    "translate": (0.0, 1.0),   # Translation
+    "scale": (0.0, 2.0),       # Scale
+    "shear": (0.0, 45.0),      # Shear
+    "perspective": (0.0, 0.001), # Perspective
+    "flipud": (0.0, 1.0),      # Flip up-down
+    "fliplr": (0.0, 1.0),      # Flip left-right
+    "mosaic": (0.0, 1.0),      # Mosaic
+    "mixup": (0.0, 1.0),       # MixUp
+    "copy_paste": (0.0, 1.0),  # Copy-paste
+}
+
+# Mesmas faixas em arrays alinhados, para validação em lote
+_AUG_PARAM_ORDER = tuple(_AUG_PARAM_RANGES)
+_AUG_PARAM_INDEX = {param: i for i, param in enumerate(_AUG_PARAM_ORDER)}
+_AUG_MIN = np.array([low for low, _ in _AUG_PARAM_RANGES.values()], dtype=np.float64)
+_AUG_MAX = np.array([high for _, high in _AUG_PARAM_RANGES.values()], dtype=np.float64)
+
+# Campos copiados sem validação específica
+_TRAINING_PASSTHROUGH_FIELDS = (
+    "patience", "save_period", "workers", "project", "name",
+    "exist_ok", "pretrained", "verbose", "seed", "deterministic",
+    "single_cls", "rect", "cos_lr", "close_mosaic", "resume",
+    "amp", "fraction", "profile", "freeze", "multi_scale",
+    "overlap_mask", "mask_ratio", "dropout", "val"
+)
+_INFERENCE_PASSTHROUGH_FIELDS = ("max_det", "classes", "agnostic_nms", "retina_masks", "embed")
+_TRAINING_PASSTHROUGH_SET = frozenset(_TRAINING_PASSTHROUGH_FIELDS)
+_INFERENCE_PASSTHROUGH_SET = frozenset(_INFERENCE_PASSTHROUGH_FIELDS)
+
+
+class _LazyValueError(ValueError):
+    """ValueError que só formata a mensagem quando ela é lida"""
+    
+    def __init__(self, msg: str, *args: Any):
+        super().__init__(msg, *args)
+        self._msg = msg
+        self._fmt_args = args
+    
+    def __str__(self) -> str:
+        return self._msg % self._fmt_args
+
+
+def _err(msg: str, *args: Any) -> ValueError:
+    """Criar ValueError com formatação adiada (estilo %)"""
+    return _LazyValueError(msg, *args)
+
 
 def validate_model_type(model_type: str) -> str:
     """Validar tipo de modelo YOLO"""
-    valid_models = [
-        # YOLOv8
-        "yolov8n", "yolov8s", "yolov8m", "yolov8l", "yolov8x",
-        # YOLOv9
-        "yolov9c", "yolov9e",
-        # YOLOv10
-        "yolov10n", "yolov10s", "yolov10m", "yolov10b", "yolov10l", "yolov10x",
-        # YOLOv11
-        "yolov11n", "yolov11s", "yolov11m", "yolov11l", "yolov11x",
-        # Segmentação
-        "yolov8n-seg", "yolov8s-seg", "yolov8m-seg", "yolov8l-seg", "yolov8x-seg",
-        # Classificação
-        "yolov8n-cls", "yolov8s-cls", "yolov8m-cls", "yolov8l-cls", "yolov8x-cls",
-        # Pose
-        "yolov8n-pose", "yolov8s-pose", "yolov8m-pose", "yolov8l-pose", "yolov8x-pose"
-    ]
-    
-    if model_type not in valid_models:
-        raise ValueError(f"Modelo inválido. Use um dos: {', '.join(valid_models)}")
+    if model_type not in _VALID_MODELS:
+        raise ValueError(f"Modelo inválido. Use um dos: {_VALID_MODELS_MSG}")
     
     return model_type
 
@@ -39,11 +139,11 @@ def validate_model_type(model_type: str) -> str:
 def validate_image_size(image_size: Union[int, List[int]]) -> Union[int, List[int]]:
     """Validar tamanho de imagem"""
     if isinstance(image_size, int):
-        if image_size < 32 or image_size > 2048:
+        if not (32 <= image_size <= 2048):
             raise ValueError("Tamanho de imagem deve estar entre 32 e 2048 pixels")
         
-        # Deve ser múltiplo de 32 para YOLO
-        if image_size % 32 != 0:
+        # Deve ser múltiplo de 32 para YOLO (valor já positivo: basta a máscara)
+        if image_size & 31:
             raise ValueError("Tamanho de imagem deve ser múltiplo de 32")
         
         return image_size
@@ -74,20 +174,21 @@ def validate_batch_size(batch_size: int, available_memory_gb: Optional[float] =
     if batch_size > 256:
         raise ValueError("Batch size muito grande (máximo 256)")
     
+    # Demais checagens só geram avisos
+    if not logger.isEnabledFor(logging.WARNING):
+        return batch_size
+    
     # Verificar se é potência de 2 (recomendado para performance)
     if batch_size & (batch_size - 1) != 0:
         logger.warning(f"Batch size {batch_size} não é potência de 2. Recomendado: 1, 2, 4, 8, 16, 32, 64, 128")
     
     # Estimar uso de memória se informação disponível
     if available_memory_gb:
-        # Estimativa grosseira: ~100MB por imagem no batch para YOLOv8
-        estimated_memory_gb = (batch_size * 100) / 1024  # MB para GB
-        
-        if estimated_memory_gb > available_memory_gb * 0.8:  # 80% da memória disponível
-            suggested_batch = max(1, int((available_memory_gb * 0.8 * 1024) / 100))
+        max_batch = available_memory_gb * _BATCH_PER_GB
+        if batch_size > max_batch:
             logger.warning(
                 f"Batch size {batch_size} pode exceder memória disponível. "
-                f"Sugerido: {suggested_batch}"
+                f"Sugerido: {max(1, int(max_batch))}"
             )
     
     return batch_size
@@ -113,6 +214,9 @@ def validate_learning_rate(learning_rate: float) -> float:
         raise ValueError("Taxa de aprendizado muito alta (máximo 1.0)")
     
     # Avisos para valores não usuais
+    if not logger.isEnabledFor(logging.WARNING):
+        return learning_rate
+    
     if learning_rate > 0.1:
         logger.warning(f"Taxa de aprendizado {learning_rate} é alta. Valores típicos: 0.001-0.01")
     
@@ -124,65 +228,70 @@ def validate_learning_rate(learning_rate: float) -> float:
 
 def validate_optimizer(optimizer: str) -> str:
     """Validar otimizador"""
-    valid_optimizers = ["SGD", "Adam", "AdamW", "RMSprop", "LBFGS"]
-    
-    if optimizer not in valid_optimizers:
-        raise ValueError(f"Otimizador inválido. Use um dos: {', '.join(valid_optimizers)}")
+    if optimizer not in _VALID_OPTIMIZERS:
+        raise ValueError(f"Otimizador inválido. Use um dos: {_VALID_OPTIMIZERS_MSG}")
     
     return optimizer
 
 
 def validate_dataset_path(dataset_path: Union[str, Path]) -> Path:
     """Validar caminho do dataset"""
-    path = Path(dataset_path)
+    path = dataset_path if isinstance(dataset_path, Path) else Path(dataset_path)
     
     if not path.exists():
-        raise ValueError(f"Dataset não encontrado: {path}")
+        raise _err("Dataset não encontrado: %s", path)
     
     if not path.is_dir():
-        raise ValueError(f"Caminho deve ser um diretório: {path}")
+        raise _err("Caminho deve ser um diretório: %s", path)
     
     # Verificar estrutura básica YOLO
     required_dirs = ["images"]
     for dir_name in required_dirs:
         dir_path = path / dir_name
         if not dir_path.exists():
-            raise ValueError(f"Diretório obrigatório não encontrado: {dir_name}")
+            raise _err("Diretório obrigatório não encontrado: %s", dir_name)
     
     # Verificar se há pelo menos um split de treino
     train_dir = path / "images" / "train"
-    if not train_dir.exists():
+    try:
+        train_mtime_ns = os.stat(train_dir).st_mtime_ns
+    except OSError:
         raise ValueError("Diretório 'images/train' não encontrado")
     
-    # Verificar se há imagens
-    image_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp']
-    has_images = False
-    
-    for ext in image_extensions:
-        if list(train_dir.glob(f"*{ext}")) or list(train_dir.glob(f"*{ext.upper()}")):
-            has_images = True
-            break
-    
-    if not has_images:
+    # Verificar se há imagens (memoizado até o diretório mudar)
+    if not _train_dir_has_images(str(train_dir), train_mtime_ns):
         raise ValueError("Nenhuma imagem encontrada no diretório de treino")
     
     return path
 
 
+@lru_cache(maxsize=256)
+def _train_dir_has_images(train_dir: str, mtime_ns: int) -> bool:
+    """Verificar se o diretório de treino contém imagens (chave inclui mtime)"""
+    # Uma única listagem, interrompida na primeira imagem encontrada
+    try:
+        with os.scandir(train_dir) as entries:
+            return any(
+                os.path.splitext(e.name)[1][1:].lower() in _TRAIN_IMAGE_EXTS and e.is_file()
+                for e in entries
+            )
+    except NotADirectoryError:
+        return False
+
+
 def validate_model_path(model_path: Union[str, Path]) -> Path:
     """Validar caminho do modelo"""
-    path = Path(model_path)
+    path = model_path if isinstance(model_path, Path) else Path(model_path)
     
     if not path.exists():
-        raise ValueError(f"Modelo não encontrado: {path}")
+        raise _err("Modelo não encontrado: %s", path)
     
     if not path.is_file():
-        raise ValueError(f"Caminho deve ser um arquivo: {path}")
+        raise _err("Caminho deve ser um arquivo: %s", path)
     
     # Verificar extensão
-    valid_extensions = ['.pt', '.pth', '.onnx', '.engine', '.tflite']
-    if path.suffix.lower() not in valid_extensions:
-        raise ValueError(f"Extensão inválida. Use: {', '.join(valid_extensions)}")
+    if path.suffix.lower() not in _VALID_MODEL_EXTS:
+        raise ValueError(f"Extensão inválida. Use: {_VALID_MODEL_EXTS_MSG}")
     
     return path
 
@@ -198,7 +307,7 @@ def validate_job_name(job_name: str) -> str:
         raise ValueError("Nome do job muito longo (máximo 100 caracteres)")
     
     # Verificar caracteres válidos
-    if not re.match(r'^[a-zA-Z0-9\s\-_\.]+$', job_name):
+    if not _JOB_NAME_RE.match(job_name):
         raise ValueError("Nome do job contém caracteres inválidos. Use apenas letras, números, espaços, hífens, underscores e pontos")
     
     return job_name
@@ -206,47 +315,27 @@ def validate_job_name(job_name: str) -> str:
 
 def validate_device(device: str) -> str:
     """Validar dispositivo"""
-    valid_devices = ["auto", "cpu", "cuda", "mps"]
-    
     # Permitir especificação de GPU específica (ex: cuda:0, cuda:1)
     if device.startswith("cuda:"):
-        try:
-            gpu_id = int(device.split(":")[1])
-            if gpu_id < 0:
-                raise ValueError("ID da GPU deve ser não-negativo")
-            return device
-        except (IndexError, ValueError):
+        if _CUDA_DEVICE_RE.match(device) is None:
             raise ValueError("Formato inválido para dispositivo CUDA. Use 'cuda:N' onde N é o ID da GPU")
+        return device
     
-    if device not in valid_devices:
-        raise ValueError(f"Dispositivo inválido. Use um dos: {', '.join(valid_devices)} ou 'cuda:N'")
+    if device not in _VALID_DEVICES:
+        raise ValueError(f"Dispositivo inválido. Use um dos: {_VALID_DEVICES_MSG} ou 'cuda:N'")
     
     return device
 
 
 def validate_augmentation_params(params: Dict[str, Any]) -> Dict[str, Any]:
     """Validar parâmetros de data augmentation"""
-    valid_params = {
-        "hsv_h": (0.0, 1.0),      # Hue
-        "hsv_s": (0.0, 1.0),      # Saturation
-        "hsv_v": (0.0, 1.0),      # Value
-        "degrees": (0.0, 180.0),   # Rotation
-        "translate": (0.0, 1.0),   # Translation
-        "scale": (0.0, 2.0),       # Scale
-        "shear": (0.0, 45.0),      # Shear
-        "perspective": (0.0, 0.001), # Perspective
-        "flipud": (0.0, 1.0),      # Flip up-down
-        "fliplr": (0.0, 1.0),      # Flip left-right
-        "mosaic": (0.0, 1.0),      # Mosaic
-        "mixup": (0.0, 1.0),       # MixUp
-        "copy_paste": (0.0, 1.0),  # Copy-paste
-    }
-    
+    valid_params = _AUG_PARAM_RANGES
     validated_params = {}
     
     for param, value in params.items():
         if param not in valid_params:
-            logger.warning(f"Parâmetro de augmentation desconhecido: {param}")
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning(f"Parâmetro de augmentation desconhecido: {param}")
             continue
         
         min_val, max_val = valid_params[param]
@@ -262,17 +351,51 @@ def validate_augmentation_params(params: Dict[str, Any]) -> Dict[str, Any]:
     return validated_params
 
 
+def validate_augmentation_params_batch(params_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Validar vários conjuntos de augmentation de uma vez (ex.: busca de hiperparâmetros)
+    
+    Os valores são empilhados em uma matriz (N, K) e comparados com as faixas
+    em uma única operação vetorizada; parâmetros ausentes são marcados em uma
+    máscara separada, para que NaN informado seja rejeitado como no escalar.
+    """
+    shape = (len(params_list), len(_AUG_PARAM_ORDER))
+    arr = np.zeros(shape, dtype=np.float64)
+    present = np.zeros(shape, dtype=bool)
+    
+    for row, params in enumerate(params_list):
+        for param, value in params.items():
+            col = _AUG_PARAM_INDEX.get(param)
+            if col is None:
+                if logger.isEnabledFor(logging.WARNING):
+                    logger.warning(f"Parâmetro de augmentation desconhecido: {param}")
+                continue
+            if not isinstance(value, (int, float)):
+                raise ValueError(f"Parâmetro {param} deve ser numérico (config {row})")
+            arr[row, col] = value
+            present[row, col] = True
+    
+    # Negar o "dentro da faixa" também pega NaN (toda comparação é False)
+    invalid = present & ~((arr >= _AUG_MIN) & (arr <= _AUG_MAX))
+    if invalid.any():
+        errors = [
+            f"config {row}: {_AUG_PARAM_ORDER[col]} deve estar entre {_AUG_MIN[col]} e {_AUG_MAX[col]}"
+            for row, col in np.argwhere(invalid).tolist()
+        ]
+        raise ValueError("Parâmetros de augmentation inválidos: " + "; ".join(errors))
+    
+    return [
+        {_AUG_PARAM_ORDER[col]: value for col, value in enumerate(values) if mask[col]}
+        for values, mask in zip(arr.tolist(), present.tolist())
+    ]
+
+
 def validate_export_format(export_format: str) -> str:
     """Validar formato de exportação"""
-    valid_formats = [
-        "onnx", "openvino", "engine", "coreml", "saved_model",
-        "pb", "tflite", "edgetpu", "tfjs", "paddle"
-    ]
-    
-    if export_format.lower() not in valid_formats:
-        raise ValueError(f"Formato de exportação inválido. Use um dos: {', '.join(valid_formats)}")
+    export_format = export_format.lower()
+    if export_format not in _VALID_EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportação inválido. Use um dos: {_VALID_EXPORT_FORMATS_MSG}")
     
-    return export_format.lower()
+    return export_format
 
 
 def validate_confidence_threshold(confidence: float) -> float:
@@ -299,70 +422,74 @@ def validate_class_names(class_names: List[str]) -> List[str]:
     if len(class_names) > 1000:
         raise ValueError("Muitas classes (máximo 1000)")
     
-    # Verificar duplicatas
-    if len(class_names) != len(set(class_names)):
-        raise ValueError("Nomes de classes duplicados encontrados")
+    # Checagens em lote (laços em C); o índice do culpado só é procurado
+    # quando há erro
+    if not all(isinstance(name, str) for name in class_names):
+        i = next(i for i, name in enumerate(class_names) if not isinstance(name, str))
+        raise ValueError(f"Nome da classe {i} deve ser string")
     
-    # Validar cada nome
-    validated_names = []
-    for i, name in enumerate(class_names):
-        if not isinstance(name, str):
-            raise ValueError(f"Nome da classe {i} deve ser string")
-        
-        name = name.strip()
-        if not name:
-            raise ValueError(f"Nome da classe {i} não pode estar vazio")
-        
-        if len(name) > 50:
-            raise ValueError(f"Nome da classe {i} muito longo (máximo 50 caracteres)")
-        
-        validated_names.append(name)
+    validated_names = [name.strip() for name in class_names]
+    lengths = array.array('i', map(len, validated_names))
+    
+    if min(lengths) == 0:
+        raise ValueError(f"Nome da classe {lengths.index(0)} não pode estar vazio")
+    
+    if max(lengths) > 50:
+        i = next(i for i, n in enumerate(lengths) if n > 50)
+        raise ValueError(f"Nome da classe {i} muito longo (máximo 50 caracteres)")
+    
+    if len(set(validated_names)) != len(validated_names):
+        seen = set()
+        name = next(n for n in validated_names if n in seen or seen.add(n))
+        raise ValueError(f"Nomes de classes duplicados encontrados: {name}")
     
     return validated_names
 
 
+# Validadores por campo da configuração de treinamento
+_TRAINING_REQUIRED_VALIDATORS = (
+    ("model_type", validate_model_type),
+    ("epochs", validate_epochs),
+    ("batch_size", validate_batch_size),
+    ("image_size", validate_image_size),
+)
+_TRAINING_OPTIONAL_VALIDATORS = (
+    ("learning_rate", validate_learning_rate),
+    ("optimizer", validate_optimizer),
+    ("device", validate_device),
+    ("augmentation_params", validate_augmentation_params),
+)
+
+
 def validate_training_config(config: Dict[str, Any]) -> Dict[str, Any]:
-    """Validar configuração completa de treinamento"""
-    validated_config = {}
+    """Validar configuração completa de treinamento
     
-    # Validações obrigatórias
-    required_fields = ["model_type", "epochs", "batch_size", "image_size"]
+    Todos os erros são acumulados e levantados juntos em um único ValueError.
+    """
+    validated_config = {}
+    errors = []
     
-    for field in required_fields:
+    for field, validator in _TRAINING_REQUIRED_VALIDATORS:
         if field not in config:
-            raise ValueError(f"Campo obrigatório ausente: {field}")
-    
-    # Aplicar validações específicas
-    validated_config["model_type"] = validate_model_type(config["model_type"])
-    validated_config["epochs"] = validate_epochs(config["epochs"])
-    validated_config["batch_size"] = validate_batch_size(config["batch_size"])
-    validated_config["image_size"] = validate_image_size(config["image_size"])
-    
-    # Validações opcionais
-    if "learning_rate" in config:
-        validated_config["learning_rate"] = validate_learning_rate(config["learning_rate"])
-    
-    if "optimizer" in config:
-        validated_config["optimizer"] = validate_optimizer(config["optimizer"])
-    
-    if "device" in config:
-        validated_config["device"] = validate_device(config["device"])
-    
-    if "augmentation_params" in config:
-        validated_config["augmentation_params"] = validate_augmentation_params(config["augmentation_params"])
-    
-    # Copiar outros campos sem validação específica
-    other_fields = [
-        "patience", "save_period", "workers", "project", "name",
-        "exist_ok", "pretrained", "verbose", "seed", "deterministic",
-        "single_cls", "rect", "cos_lr", "close_mosaic", "resume",
-        "amp", "fraction", "profile", "freeze", "multi_scale",
-        "overlap_mask", "mask_ratio", "dropout", "val"
-    ]
+            errors.append(f"Campo obrigatório ausente: {field}")
+            continue
+        try:
+            validated_config[field] = validator(config[field])
+        except ValueError as e:
+            errors.append(str(e))
     
-    for field in other_fields:
+    for field, validator in _TRAINING_OPTIONAL_VALIDATORS:
         if field in config:
-            validated_config[field] = config[field]
+            try:
+                validated_config[field] = validator(config[field])
+            except ValueError as e:
+                errors.append(str(e))
+    
+    if errors:
+        raise ValueError("; ".join(errors))
+    
+    # Interseção em C: só itera os campos realmente presentes
+    validated_config.update((field, config[field]) for field in _TRAINING_PASSTHROUGH_SET & config.keys())
     
     return validated_config
 
@@ -400,35 +527,95 @@ def validate_system_resources(resources: Dict[str, Any]) -> bool:
     return len(critical_warnings) == 0
 
 
+def _config_digest(config: Dict[str, Any]) -> Optional[bytes]:
+    """Hash estável do conteúdo da configuração (None se não serializável)"""
+    try:
+        payload = orjson.dumps(config, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        return None
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
 class ConfigValidator:
     """Classe para validação de configurações complexas"""
     
+    # Campos de job já validados (treinamento e nome), por hash do conteúdo (LRU)
+    JOB_CONFIG_CACHE_SIZE = 256
+    _job_config_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+    _job_config_lock = threading.Lock()
+    
     @staticmethod
     def validate_job_config(config: Dict[str, Any]) -> Dict[str, Any]:
-        """Validar configuração completa do job"""
+        """Validar configuração completa do job
+        
+        Reenvios idênticos reaproveitam a validação dos campos puros;
+        configurações inválidas nunca entram no cache. As checagens de disco
+        (dataset e modelo base) rodam sempre, pois o sistema de arquivos muda.
+        """
+        cache = ConfigValidator._job_config_cache
+        lock = ConfigValidator._job_config_lock
+        
         try:
-            # Validar configuração de treinamento
-            if "training_config" in config:
-                config["training_config"] = validate_training_config(config["training_config"])
+            key = _config_digest(config)
             
-            # Validar nome do job
-            if "name" in config:
-                config["name"] = validate_job_name(config["name"])
+            cached = None
+            if key is not None:
+                with lock:
+                    cached = cache.get(key)
+                    if cached is not None:
+                        cache.move_to_end(key)
             
-            # Validar dataset
-            if "dataset_path" in config:
-                config["dataset_path"] = str(validate_dataset_path(config["dataset_path"]))
-            
-            # Validar modelo base se especificado
-            if "base_model_path" in config and config["base_model_path"]:
-                config["base_model_path"] = str(validate_model_path(config["base_model_path"]))
+            if cached is not None:
+                # Mantém o contrato de validar in-place
+                config.update(copy.deepcopy(cached))
+            else:
+                validated = ConfigValidator._validate_job_fields(config)
+                config.update(validated)
+                if key is not None:
+                    with lock:
+                        cache[key] = copy.deepcopy(validated)
+                        if len(cache) > ConfigValidator.JOB_CONFIG_CACHE_SIZE:
+                            cache.popitem(last=False)
             
+            ConfigValidator._validate_job_paths(config)
             return config
             
         except Exception as e:
             logger.error(f"Erro na validação da configuração: {e}")
             raise
     
+    @staticmethod
+    def _validate_job_fields(config: Dict[str, Any]) -> Dict[str, Any]:
+        """Validar os campos que dependem só do conteúdo da configuração"""
+        validated = {}
+        
+        # Validar configuração de treinamento
+        if "training_config" in config:
+            validated["training_config"] = validate_training_config(config["training_config"])
+        
+        # Validar nome do job
+        if "name" in config:
+            validated["name"] = validate_job_name(config["name"])
+        
+        return validated
+    
+    @staticmethod
+    def _validate_job_paths(config: Dict[str, Any]) -> None:
+        """Validar dataset e modelo base (se especificado) no disco, in-place"""
+        # Com os dois presentes, as checagens de disco rodam em paralelo
+        check_dataset = "dataset_path" in config
+        check_model = bool(config.get("base_model_path"))
+        
+        if check_dataset and check_model:
+            dataset_future = _FS_EXECUTOR.submit(validate_dataset_path, config["dataset_path"])
+            model_future = _FS_EXECUTOR.submit(validate_model_path, config["base_model_path"])
+            config["dataset_path"] = str(dataset_future.result())
+            config["base_model_path"] = str(model_future.result())
+        elif check_dataset:
+            config["dataset_path"] = str(validate_dataset_path(config["dataset_path"]))
+        elif check_model:
+            config["base_model_path"] = str(validate_model_path(config["base_model_path"]))
+    
     @staticmethod
     def validate_inference_config(config: Dict[str, Any]) -> Dict[str, Any]:
         """Validar configuração de inferência"""
@@ -454,9 +641,6 @@ class ConfigValidator:
             validated_config["image_size"] = validate_image_size(config["image_size"])
         
         # Copiar outros campos
-        other_fields = ["max_det", "classes", "agnostic_nms", "retina_masks", "embed"]
-        for field in other_fields:
-            if field in config:
-                validated_config[field] = config[field]
+        validated_config.update((field, config[field]) for field in _INFERENCE_PASSTHROUGH_SET & config.keys())
         
         return validated_config
\ No newline at end of file
@@ -5,7 +5,7 @@ usando o dataset projeto-classe-excluded preparado
 """
 
 import requests
-import json
+import orjson
 from datetime import datetime
 
 # Configurações da API
@@ -18,6 +18,13 @@ headers = {
     "Content-Type": "application/json"
 }
 
+# Sessão compartilhada: reaproveita a conexão (keep-alive) entre as chamadas
+SESSION = requests.Session()
+SESSION.headers.update(headers)
+_adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
 def create_training_job():
     """Cria um novo job de treinamento para o dataset customizado"""
     
@@ -52,10 +59,9 @@ def create_training_job():
     
     try:
         # Fazer requisição para criar o job
-        response = requests.post(
+        response = SESSION.post(
             f"{API_BASE_URL}/training/start",
-            headers=headers,
-            json=job_config,
+            data=orjson.dumps(job_config),  # Content-Type já definido na sessão
             timeout=30
         )
         
@@ -80,9 +86,8 @@ def list_jobs():
     print("\n📋 Listando jobs existentes...")
     
     try:
-        response = requests.get(
+        response = SESSION.get(
             f"{API_BASE_URL}/jobs/",
-            headers=headers,
             timeout=10
         )
         
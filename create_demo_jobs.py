@@ -3,11 +3,28 @@
 Script para criar jobs de demonstração para a interface do YOLO Training Server
 """
 
-import json
+import os
+import orjson
 from datetime import datetime, timedelta
 from pathlib import Path
 import uuid
 
+# Listas de classes compartilhadas (tuplas imutáveis, criadas uma vez)
+_COCO_CLASSES = (
+    "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck",
+    "boat", "traffic light", "fire hydrant", "stop sign", "parking meter", "bench",
+    "bird", "cat", "dog", "horse", "sheep", "cow", "elephant", "bear", "zebra",
+    "giraffe", "backpack", "umbrella", "handbag", "tie", "suitcase", "frisbee", "skis",
+    "snowboard", "sports ball", "kite", "baseball bat", "baseball glove", "skateboard",
+    "surfboard", "tennis racket", "bottle", "wine glass", "cup", "fork", "knife",
+    "spoon", "bowl", "banana", "apple", "sandwich", "orange", "broccoli", "carrot",
+    "hot dog", "pizza", "donut", "cake", "chair", "couch", "potted plant", "bed",
+    "dining table", "toilet", "tv", "laptop", "mouse", "remote", "keyboard",
+    "cell phone", "microwave", "oven", "toaster", "sink", "refrigerator", "book",
+    "clock", "vase", "scissors", "teddy bear", "hair drier", "toothbrush"
+)
+_VEHICLE_CLASSES = ("car", "truck", "bus", "motorcycle", "bicycle")
+
 def create_demo_jobs():
     """Criar jobs de demonstração"""
     
@@ -39,7 +56,7 @@ def create_demo_jobs():
             "dataset": {
                 "name": "coco128",
                 "path": "data/datasets/coco128",
-                "classes": ["person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat", "traffic light", "fire hydrant", "stop sign", "parking meter", "bench", "bird", "cat", "dog", "horse", "sheep", "cow", "elephant", "bear", "zebra", "giraffe", "backpack", "umbrella", "handbag", "tie", "suitcase", "frisbee", "skis", "snowboard", "sports ball", "kite", "baseball bat", "baseball glove", "skateboard", "surfboard", "tennis racket", "bottle", "wine glass", "cup", "fork", "knife", "spoon", "bowl", "banana", "apple", "sandwich", "orange", "broccoli", "carrot", "hot dog", "pizza", "donut", "cake", "chair", "couch", "potted plant", "bed", "dining table", "toilet", "tv", "laptop", "mouse", "remote", "keyboard", "cell phone", "microwave", "oven", "toaster", "sink", "refrigerator", "book", "clock", "vase", "scissors", "teddy bear", "hair drier", "toothbrush"],
+                "classes": _COCO_CLASSES,
                 "train_images": 128,
                 "val_images": 128,
                 "test_images": None
@@ -98,7 +115,7 @@ def create_demo_jobs():
             "dataset": {
                 "name": "vehicle_detection",
                 "path": "data/datasets/vehicles",
-                "classes": ["car", "truck", "bus", "motorcycle", "bicycle"],
+                "classes": _VEHICLE_CLASSES,
                 "train_images": 2500,
                 "val_images": 500,
                 "test_images": 200
@@ -176,9 +193,12 @@ def create_demo_jobs():
         }
     ]
     
-    # Salvar jobs no arquivo
-    with open(jobs_file, 'w', encoding='utf-8') as f:
-        json.dump(demo_jobs, f, indent=2, ensure_ascii=False)
+    # Salvar jobs no arquivo (orjson já gera UTF-8 sem escapar acentos);
+    # escrita única em arquivo temporário + os.replace para ser atômica
+    payload = orjson.dumps(demo_jobs, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    tmp_file = jobs_file.with_suffix(".json.tmp")
+    tmp_file.write_bytes(payload)
+    os.replace(tmp_file, jobs_file)
     
     print(f"✅ {len(demo_jobs)} jobs de demonstração criados com sucesso!")
     print("📊 Jobs criados:")
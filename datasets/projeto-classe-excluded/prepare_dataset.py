@@ -5,12 +5,25 @@ Prepares the dataset in YOLO format with proper train/val/test splits
 """
 
 import os
-import shutil
-import random
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Tuple
+
+import numpy as np
 import json
 
+# Shared zero-copy file copy from the server package (repository root)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from app.utils.helpers import copy_file_fast
+
+try:
+    # tqdm ships with ultralytics; optional here
+    from tqdm import tqdm
+    TQDM_AVAILABLE = True
+except ImportError:
+    TQDM_AVAILABLE = False
+
 def create_directory_structure(base_path: Path) -> None:
     """Create the YOLO dataset directory structure"""
     directories = [
@@ -23,102 +36,135 @@ def create_directory_structure(base_path: Path) -> None:
     ]
     
     for directory in directories:
-        (base_path / directory).mkdir(parents=True, exist_ok=True)
+        os.makedirs(os.path.join(base_path, directory), exist_ok=True)
     
     print(f"✅ Created directory structure at {base_path}")
 
-def get_image_label_pairs(source_path: Path) -> List[Tuple[Path, Path]]:
-    """Get matching image-label pairs"""
+def get_image_label_pairs(source_path: Path) -> List[str]:
+    """Get the stems of matching image-label pairs.
+    
+    Only the stem is kept per pair: both paths are derived on the fly as
+    images/<stem>.jpg and labels/<stem>.txt under source_path.
+    """
     images_dir = source_path / "images"
     labels_dir = source_path / "labels"
     
-    pairs = []
-    
-    # Get all image files
-    image_files = list(images_dir.glob("*.jpg"))
-    print(f"📊 Found {len(image_files)} image files")
-    
-    # Find matching label files
-    for img_file in image_files:
-        # Try to find corresponding label file
-        label_file = labels_dir / f"{img_file.stem}.txt"
-        if label_file.exists():
-            pairs.append((img_file, label_file))
-    
-    print(f"📊 Found {len(pairs)} matching image-label pairs")
-    return pairs
+    names = []
+    
+    # One listing of the labels directory instead of a stat() per image
+    with os.scandir(labels_dir) as it:
+        label_names = {
+            e.name for e in it
+            if e.name.endswith(".txt") and e.is_file(follow_symlinks=False)
+        }
+    
+    # Get all image files and keep those with a matching label
+    image_count = 0
+    with os.scandir(images_dir) as it:
+        for entry in it:
+            # Like glob("*.jpg"): skip hidden files (e.g. macOS "._" metadata)
+            if entry.name.startswith(".") or not entry.name.endswith(".jpg"):
+                continue
+            image_count += 1
+            stem = entry.name[:-4]
+            if stem + ".txt" in label_names:
+                names.append(stem)
+    
+    print(f"📊 Found {image_count} image files")
+    
+    print(f"📊 Found {len(names)} matching image-label pairs")
+    return names
 
-def split_dataset(pairs: List[Tuple[Path, Path]], 
+def split_dataset(names: List[str], 
                  train_ratio: float = 0.7, 
                  val_ratio: float = 0.2, 
-                 test_ratio: float = 0.1) -> Tuple[List, List, List]:
-    """Split dataset into train/val/test sets"""
-    
-    # Shuffle the pairs
-    random.shuffle(pairs)
-    
-    total = len(pairs)
+                 test_ratio: float = 0.1,
+                 seed: int = 42) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Split dataset into train/val/test sets of indices into names"""
+    
+    # Shuffle via a permutation generated in C (seeded for reproducibility);
+    # the splits are uint32 views of one contiguous buffer, not lists of pairs
+    total = len(names)
+    perm = np.random.default_rng(seed).permutation(total).astype(np.uint32)
     train_size = int(total * train_ratio)
     val_size = int(total * val_ratio)
     
-    train_pairs = pairs[:train_size]
-    val_pairs = pairs[train_size:train_size + val_size]
-    test_pairs = pairs[train_size + val_size:]
+    train_idx = perm[:train_size]
+    val_idx = perm[train_size:train_size + val_size]
+    test_idx = perm[train_size + val_size:]
     
     print(f"📊 Dataset split:")
-    print(f"   Train: {len(train_pairs)} pairs ({len(train_pairs)/total*100:.1f}%)")
-    print(f"   Val:   {len(val_pairs)} pairs ({len(val_pairs)/total*100:.1f}%)")
-    print(f"   Test:  {len(test_pairs)} pairs ({len(test_pairs)/total*100:.1f}%)")
+    print(f"   Train: {len(train_idx)} pairs ({len(train_idx)/total*100:.1f}%)")
+    print(f"   Val:   {len(val_idx)} pairs ({len(val_idx)/total*100:.1f}%)")
+    print(f"   Test:  {len(test_idx)} pairs ({len(test_idx)/total*100:.1f}%)")
     
-    return train_pairs, val_pairs, test_pairs
+    return train_idx, val_idx, test_idx
+
+# Copies are syscall-bound and release the GIL, so threads overlap well
+COPY_WORKERS = min(32, (os.cpu_count() or 1) * 4)
 
-def copy_files(pairs: List[Tuple[Path, Path]], 
+def copy_files(names: List[str],
+               indices: np.ndarray,
+               source_path: Path,
                dest_images_dir: Path, 
                dest_labels_dir: Path,
-               split_name: str) -> None:
-    """Copy image-label pairs to destination directories"""
-    
-    print(f"📁 Copying {len(pairs)} {split_name} files...")
-    
-    for i, (img_file, label_file) in enumerate(pairs):
-        # Copy image
-        dest_img = dest_images_dir / img_file.name
-        shutil.copy2(img_file, dest_img)
+               split_name: str) -> int:
+    """Copy the image-label pairs names[indices] to destination directories.
+    
+    Returns the number of pairs whose image and label were both copied.
+    """
+    
+    print(f"📁 Copying {len(indices)} {split_name} files...")
+    
+    # Plain string joins: no PurePath allocation per file
+    src_images_str = os.path.join(os.fspath(source_path), "images")
+    src_labels_str = os.path.join(os.fspath(source_path), "labels")
+    dest_images_str = os.fspath(dest_images_dir)
+    dest_labels_str = os.fspath(dest_labels_dir)
+    os.makedirs(dest_images_str, exist_ok=True)
+    os.makedirs(dest_labels_str, exist_ok=True)
+    
+    failed = set()
+    join = os.path.join
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+        futures = {}
+        for index in indices.tolist():
+            image_name = names[index] + ".jpg"
+            label_name = names[index] + ".txt"
+            futures[executor.submit(copy_file_fast, join(src_images_str, image_name), join(dest_images_str, image_name))] = index
+            futures[executor.submit(copy_file_fast, join(src_labels_str, label_name), join(dest_labels_str, label_name))] = index
         
-        # Copy label
-        dest_label = dest_labels_dir / label_file.name
-        shutil.copy2(label_file, dest_label)
+        completed = as_completed(futures)
+        if TQDM_AVAILABLE:
+            # Rate-limited progress bar on stderr (counts files, two per pair)
+            completed = tqdm(completed, total=len(futures), desc=split_name,
+                             unit="file", miniters=500, mininterval=0.5)
         
-        if (i + 1) % 100 == 0:
-            print(f"   Copied {i + 1}/{len(pairs)} files...")
-    
-    print(f"✅ Completed copying {split_name} files")
+        for done, future in enumerate(completed, 1):
+            try:
+                future.result()
+            except OSError as e:
+                failed.add(futures[future])
+                print(f"   ⚠️  Failed to copy {e.filename}: {e.strerror}")
+            # Without tqdm: each pair is two futures; report every 100 pairs
+            if not TQDM_AVAILABLE and done % 200 == 0:
+                print(f"   Copied {done // 2}/{len(indices)} files...")
+    
+    copied = len(indices) - len(failed)
+    print(f"✅ Completed copying {split_name} files ({copied}/{len(indices)} pairs)")
+    return copied
 
-def validate_dataset(dataset_path: Path) -> None:
-    """Validate the prepared dataset"""
+def validate_dataset(dataset_path: Path, split_counts: Dict[str, int]) -> None:
+    """Validate the prepared dataset using the pair counts from copy_files"""
     
     print("\n🔍 Validating dataset...")
     
-    splits = ["train", "val", "test"]
-    total_images = 0
-    total_labels = 0
+    # Counts come from the copy itself: no rescan of the freshly written splits
+    for split, count in split_counts.items():
+        print(f"   {split.capitalize()}: {count} images, {count} labels")
     
-    for split in splits:
-        images_dir = dataset_path / "images" / split
-        labels_dir = dataset_path / "labels" / split
-        
-        img_count = len(list(images_dir.glob("*.jpg")))
-        label_count = len(list(labels_dir.glob("*.txt")))
-        
-        total_images += img_count
-        total_labels += label_count
-        
-        print(f"   {split.capitalize()}: {img_count} images, {label_count} labels")
-        
-        if img_count != label_count:
-            print(f"   ⚠️  Warning: Mismatch in {split} - {img_count} images vs {label_count} labels")
-    
-    print(f"\n📊 Total: {total_images} images, {total_labels} labels")
+    total = sum(split_counts.values())
+    print(f"\n📊 Total: {total} images, {total} labels")
     
     # Check data.yaml exists
     data_yaml = dataset_path / "data.yaml"
@@ -133,9 +179,6 @@ def main():
     print("🚀 Starting dataset preparation for Projeto Classe Excluded")
     print("=" * 60)
     
-    # Set random seed for reproducibility
-    random.seed(42)
-    
     # Define paths
     base_path = Path("/Volumes/SSD NVME - Backup/TRAINING SYSTEM YOLO/datasets")
     source_path = base_path / "project-1-at-2025-10-08-07-10-8b70e39d"
@@ -149,23 +192,25 @@ def main():
     # Create destination directory structure
     create_directory_structure(dest_path)
     
-    # Get image-label pairs
-    pairs = get_image_label_pairs(source_path)
+    # Get image-label pairs (stems only)
+    names = get_image_label_pairs(source_path)
     
-    if not pairs:
+    if not names:
         print("❌ No matching image-label pairs found!")
         return
     
     # Split dataset
-    train_pairs, val_pairs, test_pairs = split_dataset(pairs)
+    train_idx, val_idx, test_idx = split_dataset(names)
     
     # Copy files to respective directories
-    copy_files(train_pairs, dest_path / "images/train", dest_path / "labels/train", "train")
-    copy_files(val_pairs, dest_path / "images/val", dest_path / "labels/val", "val")
-    copy_files(test_pairs, dest_path / "images/test", dest_path / "labels/test", "test")
+    split_counts = {
+        "train": copy_files(names, train_idx, source_path, dest_path / "images/train", dest_path / "labels/train", "train"),
+        "val": copy_files(names, val_idx, source_path, dest_path / "images/val", dest_path / "labels/val", "val"),
+        "test": copy_files(names, test_idx, source_path, dest_path / "images/test", dest_path / "labels/test", "test"),
+    }
     
     # Validate the prepared dataset
-    validate_dataset(dest_path)
+    validate_dataset(dest_path, split_counts)
     
     print("\n🎉 Dataset preparation completed successfully!")
     print(f"📁 Dataset ready at: {dest_path}")
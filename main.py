@@ -13,17 +13,15 @@ from contextlib import asynccontextmanager
 import uvicorn
 from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 
-# Importações dos roteadores (serão criados)
-from app.routers import jobs, models, datasets, system, training
+# Importações dos roteadores leves; models/training puxam torch/ultralytics
+# e são registrados no lifespan (ver _include_heavy_routers)
+from app.routers import jobs, datasets, system
 from app.core.config import settings
 from app.core.logging_config import setup_logging
-from app.services.system_monitor import SystemMonitor
-from app.services.job_manager import JobManager
-from app.services.sse_manager import SSEManager
 
 # Configurar logging
 setup_logging()
@@ -33,11 +31,37 @@ logger = logging.getLogger(__name__)
 from app.core.globals import system_monitor, job_manager, sse_manager
 
 
+def _include_heavy_routers(app: FastAPI):
+    """Importar e registrar roteadores que dependem de torch/ultralytics"""
+    if getattr(app.state, "heavy_routers_included", False):
+        return
+    
+    from app.routers import models, training
+    
+    app.include_router(models.router)
+    app.include_router(training.router)
+    app.state.heavy_routers_included = True
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gerenciamento do ciclo de vida da aplicação"""
     logger.info("🚀 Iniciando Sistema de Treinamento YOLO...")
     
+    # Roteadores pesados: import adiado para não atrasar o import de main
+    _include_heavy_routers(app)
+    
+    # index.html é imutável entre deploys: resolver caminho e stat uma vez
+    app.state.index_file = None
+    app.state.index_stat = None
+    if FRONTEND_DIST:
+        index_file = FRONTEND_DIST / "index.html"
+        try:
+            app.state.index_stat = os.stat(index_file)
+            app.state.index_file = index_file
+        except OSError:
+            logger.warning(f"⚠️  index.html não encontrado em {FRONTEND_DIST}")
+    
     # Inicializar serviços
     await system_monitor.start()
     await job_manager.initialize()
@@ -68,11 +92,23 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
+    # orjson para todas as respostas JSON (health checks frequentes, stats de jobs)
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+class APIGZipMiddleware(GZipMiddleware):
+    """GZip que ignora /assets: os assets do build já são comprimidos/binários"""
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/assets/"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
 # Middleware de compressão
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(APIGZipMiddleware, minimum_size=1000)
 
 # Middleware CORS
 app.add_middleware(
@@ -86,9 +122,7 @@ app.add_middleware(
 # Incluir roteadores da API
 app.include_router(jobs.router)
 app.include_router(system.router)
-app.include_router(models.router)
 app.include_router(datasets.router)
-app.include_router(training.router)
 
 # Servir arquivos estáticos do frontend (suporta dist/ ou build/)
 FRONTEND_ROOT = Path(__file__).parent / "interface-design"
@@ -111,19 +145,14 @@ else:
 @app.get("/")
 async def serve_frontend():
     """Servir a página principal do frontend"""
-    if not FRONTEND_DIST:
+    index_file = getattr(app.state, "index_file", None)
+    if index_file is None:
         raise HTTPException(
             status_code=404,
             detail="Frontend não encontrado. Execute 'npm run build' na pasta interface-design"
         )
-    index_file = FRONTEND_DIST / "index.html"
-    if index_file.exists():
-        return FileResponse(index_file)
-    else:
-        raise HTTPException(
-            status_code=404, 
-            detail="Frontend não encontrado. Execute 'npm run build' na pasta interface-design"
-        )
+    # stat pré-calculado no lifespan: nenhum syscall extra por requisição
+    return FileResponse(index_file, stat_result=app.state.index_stat)
 
 
 @app.get("/health")
@@ -4,12 +4,26 @@ Script para restaurar jobs de demonstração no sistema de treinamento YOLO
 """
 
 import json
+import mmap
 from pathlib import Path
 from datetime import datetime, timedelta
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Caminho do arquivo jobs.json
 JOBS_FILE = Path("/Volumes/SSD NVME - Backup/TRAINING SYSTEM YOLO/data/jobs.json")
 
+# Listas de classes padrão compartilhadas pelos jobs de demonstração.
+# O jobs.json mantém "classes" expandido: é o formato lido pelo JobManager.
+CLASS_LISTS = {
+    "coco_80": ["person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat", "traffic light", "fire hydrant", "stop sign", "parking meter", "bench", "bird", "cat", "dog", "horse", "sheep", "cow", "elephant", "bear", "zebra", "giraffe", "backpack", "umbrella", "handbag", "tie", "suitcase", "frisbee", "skis", "snowboard", "sports ball", "kite", "baseball bat", "baseball glove", "skateboard", "surfboard", "tennis racket", "bottle", "wine glass", "cup", "fork", "knife", "spoon", "bowl", "banana", "apple", "sandwich", "orange", "broccoli", "carrot", "hot dog", "pizza", "donut", "cake", "chair", "couch", "potted plant", "bed", "dining table", "toilet", "tv", "laptop", "mouse", "remote", "keyboard", "cell phone", "microwave", "oven", "toaster", "sink", "refrigerator", "book", "clock", "vase", "scissors", "teddy bear", "hair drier", "toothbrush"],
+    "voc_20": ["aeroplane", "bicycle", "bird", "boat", "bottle", "bus", "car", "cat", "chair", "cow", "diningtable", "dog", "horse", "motorbike", "person", "pottedplant", "sheep", "sofa", "train", "tvmonitor"],
+}
+
 # Dados dos jobs de demonstração
 demo_jobs = [
     {
@@ -35,7 +49,7 @@ demo_jobs = [
         "dataset": {
             "name": "coco",
             "path": "/datasets/coco",
-            "classes": ["person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat", "traffic light", "fire hydrant", "stop sign", "parking meter", "bench", "bird", "cat", "dog", "horse", "sheep", "cow", "elephant", "bear", "zebra", "giraffe", "backpack", "umbrella", "handbag", "tie", "suitcase", "frisbee", "skis", "snowboard", "sports ball", "kite", "baseball bat", "baseball glove", "skateboard", "surfboard", "tennis racket", "bottle", "wine glass", "cup", "fork", "knife", "spoon", "bowl", "banana", "apple", "sandwich", "orange", "broccoli", "carrot", "hot dog", "pizza", "donut", "cake", "chair", "couch", "potted plant", "bed", "dining table", "toilet", "tv", "laptop", "mouse", "remote", "keyboard", "cell phone", "microwave", "oven", "toaster", "sink", "refrigerator", "book", "clock", "vase", "scissors", "teddy bear", "hair drier", "toothbrush"],
+            "classes": CLASS_LISTS["coco_80"],
             "train_images": 117266,
             "val_images": 4952,
             "test_images": 4069
@@ -147,7 +161,7 @@ demo_jobs = [
         "dataset": {
             "name": "voc",
             "path": "/datasets/voc",
-            "classes": ["aeroplane", "bicycle", "bird", "boat", "bottle", "bus", "car", "cat", "chair", "cow", "diningtable", "dog", "horse", "motorbike", "person", "pottedplant", "sheep", "sofa", "train", "tvmonitor"],
+            "classes": CLASS_LISTS["voc_20"],
             "train_images": 0,
             "val_images": 4952,
             "test_images": 11599
@@ -172,9 +186,12 @@ def restore_demo_jobs():
         # Garantir que o diretório existe
         JOBS_FILE.parent.mkdir(parents=True, exist_ok=True)
         
-        # Salvar jobs de demonstração
-        with open(JOBS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(demo_jobs, f, indent=2, ensure_ascii=False)
+        # Salvar jobs de demonstração (orjson: uma única escrita dos bytes)
+        if ORJSON_AVAILABLE:
+            JOBS_FILE.write_bytes(orjson.dumps(demo_jobs, option=orjson.OPT_INDENT_2))
+        else:
+            with open(JOBS_FILE, 'w', encoding='utf-8') as f:
+                json.dump(demo_jobs, f, indent=2, ensure_ascii=False)
         
         print(f"✅ {len(demo_jobs)} jobs de demonstração restaurados em {JOBS_FILE}")
         
@@ -184,8 +201,17 @@ def restore_demo_jobs():
             print(f"📁 Arquivo criado: {JOBS_FILE} ({file_size} bytes)")
             
             # Ler e mostrar conteúdo para verificação
-            with open(JOBS_FILE, 'r', encoding='utf-8') as f:
-                content = json.load(f)
+            if ORJSON_AVAILABLE and file_size:
+                # orjson lê direto do mapeamento, sem buffer intermediário
+                with open(JOBS_FILE, 'rb') as f, \
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    view = memoryview(mm)
+                    try:
+                        content = orjson.loads(view)
+                    finally:
+                        view.release()
+            else:
+                content = json.loads(JOBS_FILE.read_bytes())
             print(f"📊 Jobs no arquivo: {len(content)}")
             for job in content:
                 print(f"   - {job['id']}: {job['name']} ({job['status']})")
@@ -6,7 +6,6 @@ Script para inicializar o servidor do Sistema de Treinamento YOLO
 import os
 import sys
 import argparse
-import uvicorn
 from pathlib import Path
 
 
@@ -73,13 +72,12 @@ def check_gpu():
         import torch
         
         if torch.cuda.is_available():
-            gpu_count = torch.cuda.device_count()
-            print(f"✅ CUDA disponível: {gpu_count} GPU(s)")
+            # Uma consulta de propriedades por GPU (nome e memória vêm juntos)
+            props = [torch.cuda.get_device_properties(i) for i in range(torch.cuda.device_count())]
+            print(f"✅ CUDA disponível: {len(props)} GPU(s)")
             
-            for i in range(gpu_count):
-                gpu_name = torch.cuda.get_device_name(i)
-                gpu_memory = torch.cuda.get_device_properties(i).total_memory / 1024**3
-                print(f"   GPU {i}: {gpu_name} ({gpu_memory:.1f} GB)")
+            for i, p in enumerate(props):
+                print(f"   GPU {i}: {p.name} ({p.total_memory / 1024**3:.1f} GB)")
         
         elif torch.backends.mps.is_available():
             print("✅ MPS (Apple Silicon) disponível")
@@ -103,6 +101,9 @@ def start_server(host="0.0.0.0", port=8000, reload=False, workers=1, log_level="
     os.environ.setdefault("HOST", host)
     os.environ.setdefault("PORT", str(port))
     
+    # Import adiado: `--help` e verificações não pagam o custo do uvicorn
+    import uvicorn
+    
     try:
         uvicorn.run(
             "main:app",
@@ -2,13 +2,17 @@
 """
 Script de teste para verificar se o servidor está funcionando
 Usa httpx (já presente em requirements.txt)
-- Primeiro verifica liveness (/live) para evitar falso negativo no arranque
-- Depois, se necessário, verifica /health com algumas tentativas
+- Verifica liveness (/live) e /health ao mesmo tempo: o primeiro que
+  responder com sucesso encerra o teste (evita falso negativo no arranque)
+- /health é repetido com algumas tentativas
 """
+import asyncio
+import os
+import random
 import sys
-import time
+
 import httpx
-from httpx import RequestError
+from httpx import ConnectError, RequestError
 
 LIVENESS_URLS = [
     "http://localhost:8060/live",
@@ -20,59 +24,135 @@ HEALTH_URLS = [
     "http://127.0.0.1:8060/health",
 ]
 
+# Socket Unix do servidor (uvicorn --uds), opcional: com HEALTH_UDS definido as
+# sondas evitam a pilha TCP; se o socket não aceitar conexão, volta para TCP
+HEALTH_UDS = os.environ.get("HEALTH_UDS")
+
+# Conexão recusada = processo ainda subindo: nova tentativa rápida, sem
+# consumir uma das tentativas de check_health (até ~10 s no total)
+REFUSED_RETRY_DELAY = 0.25
+MAX_REFUSED_RETRIES = 40
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Backoff exponencial (0.25, 0.5, 1, 2, 4 s) com jitter"""
+    return min(4.0, 0.25 * (2 ** (attempt - 1))) + random.uniform(0, 0.1)
+
+
+async def _probe(client: httpx.AsyncClient, url: str, timeout: float):
+    """GET sem lançar exceção; retorna (url, resposta, erro)"""
+    try:
+        return url, await client.get(url, timeout=timeout), None
+    except Exception as e:
+        return url, None, e
 
-def ping_liveness() -> bool:
+
+def _probe_all(client: httpx.AsyncClient, urls, timeout: float):
+    """GET em todas as URLs ao mesmo tempo, na ordem de chegada.
+    
+    localhost pode resolver para IPv6 e travar até o timeout: disparar as
+    variantes em paralelo evita somar os atrasos.
+    """
+    return asyncio.as_completed([_probe(client, url, timeout) for url in urls])
+
+
+async def ping_liveness(client: httpx.AsyncClient) -> bool:
     """Tenta endpoints de liveness rápidos"""
-    for url in LIVENESS_URLS:
-        try:
-            res = httpx.get(url, timeout=3)
-            if res.status_code == 200:
-                print(f"✅ Liveness OK: {url}")
-                return True
-        except Exception as e:
-            print(f"⚠️  Liveness falhou em {url}: {e}")
+    for next_result in _probe_all(client, LIVENESS_URLS, timeout=3):
+        url, res, error = await next_result
+        if error is not None:
+            print(f"⚠️  Liveness falhou em {url}: {error}")
+        elif res.status_code == 200:
+            print(f"✅ Liveness OK: {url}")
+            return True
     return False
 
 
-def check_health(max_attempts: int = 5) -> bool:
+async def check_health(client: httpx.AsyncClient, max_attempts: int = 5) -> bool:
     """Verifica /health com retries"""
-    for attempt in range(1, max_attempts + 1):
+    attempt = 1
+    refused_retries = 0
+    while attempt <= max_attempts:
+        refused = 0
         for url in HEALTH_URLS:
-            try:
-                print(f"Tentativa {attempt}/{max_attempts}: Testando {url}")
-                with httpx.Client(timeout=10) as client:
-                    response = client.get(url)
-                
-                if response.status_code == 200:
-                    print(f"✅ SUCCESS: Status {response.status_code}")
-                    try:
-                        print(f"Response: {response.json()}")
-                    except Exception:
-                        print(f"Response: {response.text}")
-                    return True
-                else:
-                    print(f"❌ FAIL: Status {response.status_code}")
+            print(f"Tentativa {attempt}/{max_attempts}: Testando {url}")
+        
+        for next_result in _probe_all(client, HEALTH_URLS, timeout=10):
+            url, response, error = await next_result
+            if isinstance(error, ConnectError):
+                refused += 1
+                print(f"❌ CONNECTION ERROR ({url}): {error}")
+            elif isinstance(error, RequestError):
+                print(f"❌ CONNECTION ERROR ({url}): {error}")
+            elif error is not None:
+                raise error
+            elif response.status_code == 200:
+                print(f"✅ SUCCESS: Status {response.status_code} ({url})")
+                try:
+                    print(f"Response: {response.json()}")
+                except Exception:
                     print(f"Response: {response.text}")
-                    
-            except RequestError as e:
-                print(f"❌ CONNECTION ERROR: {e}")
+                return True
+            else:
+                print(f"❌ FAIL: Status {response.status_code} ({url})")
+                print(f"Response: {response.text}")
+        
+        # Ninguém escutando ainda: repetir logo, sem gastar a tentativa
+        if refused == len(HEALTH_URLS) and refused_retries < MAX_REFUSED_RETRIES:
+            refused_retries += 1
+            await asyncio.sleep(REFUSED_RETRY_DELAY)
+            continue
         
         if attempt < max_attempts:
-            print("Aguardando 5 segundos...")
-            time.sleep(5)
+            delay = _backoff_delay(attempt)
+            print(f"Aguardando {delay:.2f} segundos...")
+            await asyncio.sleep(delay)
+        attempt += 1
     
     print("❌ FINAL FAIL: Todas as tentativas falharam")
     return False
 
 
+async def _open_client() -> httpx.AsyncClient:
+    """Cliente via socket Unix quando configurado e aceitando conexões; senão TCP"""
+    if HEALTH_UDS and os.path.exists(HEALTH_UDS):
+        client = httpx.AsyncClient(transport=httpx.AsyncHTTPTransport(uds=HEALTH_UDS), timeout=3)
+        try:
+            # Qualquer resposta HTTP confirma que o socket é do servidor
+            await client.get(LIVENESS_URLS[0])
+            print(f"🔌 Usando socket Unix {HEALTH_UDS}")
+            return client
+        except RequestError as e:
+            print(f"⚠️  Socket Unix {HEALTH_UDS} indisponível ({e}); usando TCP")
+            await client.aclose()
+    return httpx.AsyncClient(timeout=3)
+
+
+async def run_checks() -> bool:
+    """Liveness e health em paralelo; sucesso no primeiro que passar"""
+    # Cliente único: o pool de conexões (keep-alive) é reaproveitado entre
+    # liveness, health e todas as tentativas
+    async with await _open_client() as client:
+        pending = {
+            asyncio.ensure_future(ping_liveness(client)),
+            asyncio.ensure_future(check_health(client)),
+        }
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if any(task.result() for task in done):
+                    return True
+            return False
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
 def main():
-    # Liveness primeiro para não degradar no arranque
-    if ping_liveness():
-        sys.exit(0)
-    # Se liveness falhar, tentar health completo
-    ok = check_health()
+    ok = asyncio.run(run_checks())
     sys.exit(0 if ok else 1)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()